@@ -1,7 +1,9 @@
 """Backend implementations for shell execution and MCP integration."""
 
 from .shell_local import LocalShellBackend, get_local_shell, close_local_shell
-from .shell_docker import DockerShellBackend, get_docker_shell, close_docker_shell
+
+# Names served from shell_docker, which is only imported when first used
+_DOCKER_EXPORTS = ("DockerShellBackend", "get_docker_shell", "close_docker_shell")
 
 __all__ = [
     "LocalShellBackend",
@@ -12,3 +14,11 @@ __all__ = [
     "close_docker_shell",
 ]
 
+
+def __getattr__(name):
+    """Import the Docker backend on first access to one of its names."""
+    if name in _DOCKER_EXPORTS:
+        from . import shell_docker
+        
+        return getattr(shell_docker, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
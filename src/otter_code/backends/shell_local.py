@@ -6,7 +6,11 @@ using SWE-ReX's LocalDeployment.
 """
 
 import asyncio
+import json
 import os
+import select
+import subprocess
+import threading
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -14,6 +18,70 @@ from swerex.deployment.local import LocalDeployment
 from swerex.runtime.abstract import BashAction, CreateBashSessionRequest
 
 
+# Driver for the persistent Python worker used by LocalShellBackend.run_python.
+# Requests and replies are single JSON lines on the worker's original stdin and
+# stdout; fds 0-2 are repointed so snippets (and their subprocesses) can't
+# interfere with the protocol.
+_PYTHON_WORKER_SOURCE = r"""
+import json, os, site, sys, sysconfig, tempfile, traceback
+
+requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+replies = os.fdopen(os.dup(1), "w", encoding="utf-8")
+devnull = os.open(os.devnull, os.O_RDONLY)
+os.dup2(devnull, 0)
+os.close(devnull)
+library_paths = sysconfig.get_paths()
+stable_prefixes = tuple({
+    os.path.join(path, "")
+    for path in [
+        *(library_paths[name] for name in ("stdlib", "platstdlib", "purelib", "platlib")),
+        *site.getsitepackages(),
+    ]
+})
+
+for line in requests:
+    request = json.loads(line)
+    preloaded = set(sys.modules)
+    exit_code = 0
+    with tempfile.TemporaryFile() as capture:
+        saved_fds = (os.dup(1), os.dup(2))
+        os.dup2(capture.fileno(), 1)
+        os.dup2(capture.fileno(), 2)
+        try:
+            if request["cwd"]:
+                os.chdir(request["cwd"])
+            sys.path[0] = os.getcwd()
+            exec(compile(request["code"], "<string>", "exec"), {"__name__": "__main__"})
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException as e:
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            os.close(saved_fds[0])
+            os.close(saved_fds[1])
+        capture.seek(0)
+        output = capture.read().decode("utf-8", errors="replace")
+    # Keep stdlib/site-packages imports warm, but re-import project modules
+    # on the next run so edits are picked up. Only the library directories
+    # count: a project may live elsewhere under the prefix (/usr/local/src).
+    for name in set(sys.modules) - preloaded:
+        module_file = getattr(sys.modules[name], "__file__", None) or ""
+        if not module_file.startswith(stable_prefixes):
+            del sys.modules[name]
+    replies.write(json.dumps({"output": output, "exit_code": exit_code}) + "\n")
+    replies.flush()
+"""
+
+
 class LocalShellBackend:
     """Persistent local shell session using SWE-ReX.
     
@@ -41,6 +109,8 @@ class LocalShellBackend:
         self._runtime = None
         self._started = False
         self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._python_worker: Optional[subprocess.Popen] = None
+        self._python_lock = threading.Lock()
     
     def _get_event_loop(self):
         """Get or create an event loop."""
@@ -109,6 +179,7 @@ class LocalShellBackend:
     
     def stop(self) -> None:
         """Stop the shell session."""
+        self._stop_python_worker()
         if self._deployment is not None:
             self._run_sync(self._stop_async())
     
@@ -158,6 +229,74 @@ class LocalShellBackend:
         """
         return self._run_sync(self._execute_async(command, timeout))
     
+    def _start_python_worker(self) -> subprocess.Popen:
+        """Start the persistent Python worker if it isn't already running."""
+        if self._python_worker is None or self._python_worker.poll() is not None:
+            self._python_worker = subprocess.Popen(
+                ["python3", "-u", "-c", _PYTHON_WORKER_SOURCE],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=str(self.working_directory),
+                env={**os.environ, **self.env},
+                text=True,
+                encoding="utf-8",
+            )
+        return self._python_worker
+    
+    def _stop_python_worker(self) -> None:
+        """Terminate the persistent Python worker."""
+        worker, self._python_worker = self._python_worker, None
+        if worker is not None and worker.poll() is None:
+            worker.kill()
+            worker.wait()
+    
+    def run_python(
+        self,
+        code: str,
+        cwd: Optional[str] = None,
+        timeout: int = 60,
+    ) -> Tuple[str, int]:
+        """Execute Python code in a persistent interpreter.
+        
+        Avoids paying interpreter startup on every call. Each snippet runs
+        in a fresh ``__main__`` namespace, but the worker runs outside the
+        bash session, so variables exported in the shell are not visible.
+        
+        Args:
+            code: Python source to execute.
+            cwd: Directory to run the code in. Defaults to the worker's
+                current directory.
+            timeout: Maximum time to wait for the code to finish.
+            
+        Returns:
+            Tuple of (output, exit_code).
+            
+        Raises:
+            TimeoutError: If the code does not finish in time. The worker
+                is killed and restarted on the next call.
+        """
+        with self._python_lock:
+            worker = self._start_python_worker()
+            try:
+                worker.stdin.write(json.dumps({"code": code, "cwd": cwd}) + "\n")
+                worker.stdin.flush()
+                ready, _, _ = select.select([worker.stdout], [], [], timeout)
+                reply = worker.stdout.readline() if ready else None
+            except OSError as e:
+                self._stop_python_worker()
+                return (f"Python worker failed: {e}", -1)
+            
+            if reply is None:
+                self._stop_python_worker()
+                raise TimeoutError(f"Python code timed out after {timeout}s")
+            if not reply:
+                self._stop_python_worker()
+                return ("Python worker exited unexpectedly", -1)
+            
+            result = json.loads(reply)
+            return (result["output"].strip(), result["exit_code"])
+    
     def get_working_directory(self) -> str:
         """Get the current working directory of the shell.
         
@@ -219,6 +358,7 @@ class LocalShellBackend:
     def __del__(self):
         """Cleanup on deletion."""
         try:
+            self._stop_python_worker()
             if self._deployment is not None and self._loop is not None:
                 if not self._loop.is_closed():
                     self._loop.run_until_complete(self._stop_async())
@@ -1,9 +1,10 @@
 """Configuration for DSPy Coding Agent tools."""
 
+import os
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 
 class ShellBackend(Enum):
@@ -12,6 +13,31 @@ class ShellBackend(Enum):
     DOCKER = "docker"
 
 
+# Lookup table for string backend names (matched case-insensitively)
+_BACKEND_MAP = {backend.value: backend for backend in ShellBackend}
+
+
+# Maximum number of memoized resolve_path results per ToolConfig
+_RESOLVED_CACHE_SIZE = 1024
+
+# Marks paths that may climb out through '..' (may also match '/..name')
+_PARENT_DIR_COMPONENT = os.sep + ".."
+
+# Fields whose normalized values the path checks are derived from
+_PATH_FIELDS = frozenset({"project_root", "allowed_paths"})
+
+# Directory names the search tools do not descend into by default
+DEFAULT_IGNORED_DIRS = frozenset({
+    ".git", "node_modules", "__pycache__", ".venv", "venv", "dist", "build",
+    ".tox", ".mypy_cache", ".pytest_cache",
+})
+
+
+def _as_dir_prefix(path: str) -> str:
+    """Terminate a normalized directory path with a separator."""
+    return path if path.endswith(os.sep) else path + os.sep
+
+
 @dataclass
 class ToolConfig:
     """Configuration for the coding agent tools.
@@ -23,7 +49,15 @@ class ToolConfig:
         docker_image: Docker image to use for sandboxed execution.
         docker_work_dir: Working directory inside the Docker container.
         shell_timeout: Default timeout for shell commands in seconds.
-        allowed_paths: List of paths the agent is allowed to access. Empty means all paths.
+        allowed_paths: Paths the agent is allowed to access, stored as a tuple.
+            Empty means all paths within project_root.
+        persistent_python: Run run_python snippets in a long-lived interpreter
+            when the shell backend supports it (local only). Snippets then
+            don't see variables exported in the shell session.
+        ignored_dirs: Directory names that recursive listings and file
+            searches do not descend into.
+        max_search_file_size: Files larger than this many bytes are skipped
+            by find_in_files. None disables the limit.
     """
     project_root: Path = field(default_factory=Path.cwd)
     shell_backend: ShellBackend = ShellBackend.LOCAL
@@ -31,49 +65,76 @@ class ToolConfig:
     docker_image: str = "python:3.11-slim"
     docker_work_dir: str = "/workspace"
     shell_timeout: int = 30
-    allowed_paths: list[Path] = field(default_factory=list)
+    allowed_paths: Sequence[Path] = ()
+    persistent_python: bool = False
+    ignored_dirs: frozenset[str] = DEFAULT_IGNORED_DIRS
+    max_search_file_size: Optional[int] = 4 * 1024 * 1024
     
     def __post_init__(self):
-        """Normalize paths after initialization."""
-        if isinstance(self.project_root, str):
-            self.project_root = Path(self.project_root)
-        self.project_root = self.project_root.resolve()
-        
+        """Normalize fields after initialization."""
         if isinstance(self.shell_backend, str):
-            self.shell_backend = ShellBackend(self.shell_backend)
+            try:
+                self.shell_backend = _BACKEND_MAP[self.shell_backend.lower()]
+            except KeyError:
+                raise ValueError(
+                    f"'{self.shell_backend}' is not a valid ShellBackend "
+                    f"(expected one of: {', '.join(_BACKEND_MAP)})"
+                ) from None
+        
+        self.ignored_dirs = frozenset(self.ignored_dirs)
+    
+    def __setattr__(self, name: str, value: object) -> None:
+        """Normalize path fields and keep the state derived from them current.
+        
+        Paths are resolved on every assignment, not just in __init__, so
+        reassigning project_root or allowed_paths on a live config moves
+        the boundary checks and drops memoized resolve_path results.
+        """
+        if name == "project_root":
+            value = Path(value).resolve()  # type: ignore[arg-type]
+        elif name == "allowed_paths":
+            value = tuple(Path(p).resolve() for p in value)  # type: ignore[attr-defined]
+        super().__setattr__(name, value)
+        
+        # __init__ assigns project_root before allowed_paths
+        if name in _PATH_FIELDS and "allowed_paths" in self.__dict__:
+            self._update_path_state()
+    
+    def _update_path_state(self) -> None:
+        """Recompute the state resolve_path and is_path_allowed read."""
+        self._project_root_str = str(self.project_root)
         
-        self.allowed_paths = [
-            Path(p).resolve() if isinstance(p, str) else p.resolve() 
-            for p in self.allowed_paths
+        # Allowed roots and their separator-terminated prefixes for the
+        # lexical check in is_path_allowed. If no restrictions, paths must
+        # be within project root.
+        allowed_roots = [
+            os.path.normpath(str(p))
+            for p in (self.allowed_paths or [self.project_root])
         ]
+        self._allowed_exact = frozenset(allowed_roots)
+        self._allowed_prefixes = tuple(_as_dir_prefix(p) for p in allowed_roots)
+        
+        # Memoized resolve_path results, keyed by the caller's path string
+        self._resolved_cache: dict[str, Path] = {}
     
-    def is_path_allowed(self, path: Path) -> bool:
+    def is_path_allowed(self, path: str | Path) -> bool:
         """Check if a path is within allowed boundaries.
         
+        The check is purely lexical and does not touch the filesystem, so
+        symlinks are not followed; resolve_path resolves paths before
+        checking them.
+        
         Args:
             path: Path to check.
             
         Returns:
             True if the path is allowed, False otherwise.
         """
-        path = path.resolve()
-        
-        # If no restrictions, check if within project root
-        if not self.allowed_paths:
-            try:
-                path.relative_to(self.project_root)
-                return True
-            except ValueError:
-                return False
-        
-        # Check against allowed paths
-        for allowed in self.allowed_paths:
-            try:
-                path.relative_to(allowed)
-                return True
-            except ValueError:
-                continue
-        return False
+        candidate = os.path.abspath(os.fspath(path))
+        return (
+            candidate in self._allowed_exact
+            or candidate.startswith(self._allowed_prefixes)
+        )
     
     def resolve_path(self, path: str | Path) -> Path:
         """Resolve a path relative to project root.
@@ -87,18 +148,56 @@ class ToolConfig:
         Raises:
             ValueError: If the path is outside allowed boundaries.
         """
-        if isinstance(path, str):
-            path = Path(path)
+        key = os.fspath(path)
+        cached = self._resolved_cache.get(key)
+        if cached is not None:
+            # Only lexical results are cached, so this rechecks the very
+            # components the caller named; one may have become a symlink
+            if self._is_symlink_free(str(cached)):
+                return cached
+            del self._resolved_cache[key]
         
-        if not path.is_absolute():
-            path = self.project_root / path
+        # Relative paths are taken from project root; join keeps absolute ones
+        joined = os.path.join(self._project_root_str, key)
         
-        path = path.resolve()
+        # Fast path: a clean path inside an allowed root only needs its
+        # components below that root checked for symlinks. '..' could be
+        # redirected by a symlink, so those paths always get a full realpath.
+        resolved = os.path.normpath(joined)
+        if (
+            _PARENT_DIR_COMPONENT not in joined
+            and self.is_path_allowed(resolved)
+            and self._is_symlink_free(resolved)
+        ):
+            path = Path(resolved)
+            if len(self._resolved_cache) >= _RESOLVED_CACHE_SIZE:
+                self._resolved_cache.clear()
+            self._resolved_cache[key] = path
+            return path
         
-        if not self.is_path_allowed(path):
-            raise ValueError(f"Path '{path}' is outside allowed boundaries")
+        # Results that went through a symlink are not cached: the link may
+        # be retargeted and a cached target would then be the wrong file
+        resolved = os.path.realpath(joined)
+        if not self.is_path_allowed(resolved):
+            raise ValueError(f"Path '{resolved}' is outside allowed boundaries")
+        
+        return Path(resolved)
+    
+    def _is_symlink_free(self, path: str) -> bool:
+        """Check that no component of an allowed path below its root is a symlink.
         
-        return path
+        Only the components below the matching allowed root are checked,
+        which is much cheaper than resolving the whole path again.
+        """
+        for prefix in self._allowed_prefixes:
+            if path.startswith(prefix):
+                current = prefix[:-1]
+                for part in path[len(prefix):].split(os.sep):
+                    current = os.path.join(current, part)
+                    if os.path.islink(current):
+                        return False
+                break
+        return True
 
 
 # Global configuration instance
@@ -111,6 +210,12 @@ def get_config() -> ToolConfig:
     Returns:
         The current ToolConfig instance.
     """
+    config = _config
+    return config if config is not None else _init_default_config()
+
+
+def _init_default_config() -> ToolConfig:
+    """Create the default configuration on first access."""
     global _config
     if _config is None:
         _config = ToolConfig()
@@ -29,9 +29,8 @@ Example usage:
     )
 """
 
-from typing import List, Optional
-
-import dspy
+from functools import cache
+from typing import TYPE_CHECKING, List, Optional
 
 from ..config import ToolConfig, get_config, set_config, configure
 
@@ -79,6 +78,9 @@ from .refactoring import (
     close_rope_project,
 )
 
+if TYPE_CHECKING:
+    import dspy
+
 
 # Categories for organizing tools
 FILESYSTEM_TOOLS = [
@@ -129,55 +131,72 @@ CORE_TOOLS = [
 ]
 
 
-def wrap_as_dspy_tool(func) -> dspy.Tool:
+def wrap_as_dspy_tool(func) -> "dspy.Tool":
     """Wrap a function as a DSPy Tool.
     
+    dspy is imported here rather than at module load, so using the tool
+    functions directly does not pay for importing dspy.
+    
     Args:
         func: The function to wrap.
         
     Returns:
         A dspy.Tool wrapping the function.
     """
+    import dspy
+    
     return dspy.Tool(func)
 
 
-def get_filesystem_tools() -> List[dspy.Tool]:
+@cache
+def _get_dspy_tool(func) -> "dspy.Tool":
+    """Get the shared dspy.Tool for a tool function.
+    
+    Wrapping introspects the function's signature and docstring, so each
+    function is wrapped once per process. The tools look up the active
+    configuration when called, so the wrappers stay valid across
+    set_config/configure calls.
+    """
+    return wrap_as_dspy_tool(func)
+
+
+def get_filesystem_tools() -> List["dspy.Tool"]:
     """Get all filesystem-related tools.
     
     Returns:
         List of DSPy Tool objects for filesystem operations.
     """
-    return [wrap_as_dspy_tool(f) for f in FILESYSTEM_TOOLS]
+    return [_get_dspy_tool(f) for f in FILESYSTEM_TOOLS]
 
 
-def get_code_editing_tools() -> List[dspy.Tool]:
+def get_code_editing_tools() -> List["dspy.Tool"]:
     """Get all code editing tools.
     
     Returns:
         List of DSPy Tool objects for code editing.
     """
-    return [wrap_as_dspy_tool(f) for f in CODE_EDITING_TOOLS]
+    return [_get_dspy_tool(f) for f in CODE_EDITING_TOOLS]
 
 
-def get_shell_tools() -> List[dspy.Tool]:
+def get_shell_tools() -> List["dspy.Tool"]:
     """Get all shell execution tools.
     
     Returns:
         List of DSPy Tool objects for shell execution.
     """
-    return [wrap_as_dspy_tool(f) for f in SHELL_TOOLS]
+    return [_get_dspy_tool(f) for f in SHELL_TOOLS]
 
 
-def get_refactoring_tools() -> List[dspy.Tool]:
+def get_refactoring_tools() -> List["dspy.Tool"]:
     """Get all Python refactoring tools.
     
     Returns:
         List of DSPy Tool objects for refactoring.
     """
-    return [wrap_as_dspy_tool(f) for f in REFACTORING_TOOLS]
+    return [_get_dspy_tool(f) for f in REFACTORING_TOOLS]
 
 
-def get_core_tools() -> List[dspy.Tool]:
+def get_core_tools() -> List["dspy.Tool"]:
     """Get a curated set of essential tools for most coding tasks.
     
     This includes basic file operations, code editing, and shell access.
@@ -185,10 +204,10 @@ def get_core_tools() -> List[dspy.Tool]:
     Returns:
         List of essential DSPy Tool objects.
     """
-    return [wrap_as_dspy_tool(f) for f in CORE_TOOLS]
+    return [_get_dspy_tool(f) for f in CORE_TOOLS]
 
 
-def get_all_tools(config: Optional[ToolConfig] = None) -> List[dspy.Tool]:
+def get_all_tools(config: Optional[ToolConfig] = None) -> List["dspy.Tool"]:
     """Get all available tools.
     
     Args:
@@ -207,7 +226,7 @@ def get_all_tools(config: Optional[ToolConfig] = None) -> List[dspy.Tool]:
         REFACTORING_TOOLS
     )
     
-    return [wrap_as_dspy_tool(f) for f in all_functions]
+    return [_get_dspy_tool(f) for f in all_functions]
 
 
 def get_tools_by_category(
@@ -216,7 +235,7 @@ def get_tools_by_category(
     shell: bool = True,
     refactoring: bool = True,
     config: Optional[ToolConfig] = None
-) -> List[dspy.Tool]:
+) -> List["dspy.Tool"]:
     """Get tools from selected categories.
     
     Args:
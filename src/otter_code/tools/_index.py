@@ -0,0 +1,160 @@
+"""In-process index of directory listings for the filesystem search tools.
+
+search_files and find_in_files walk the same trees over and over while an
+agent works. The index keeps each directory's visible file and subdirectory
+names and revalidates a directory with a single stat of its mtime, which
+changes whenever an entry is added, removed or renamed in it. Only
+directories whose mtime moved are listed again.
+"""
+
+import os
+import time
+from typing import AbstractSet, Iterator, NamedTuple, Optional, Tuple
+
+
+# Number of search roots whose indexes are kept
+_MAX_INDEXES = 8
+
+# A directory modified this close to the moment it was listed may change
+# again without its mtime moving (coarse timestamp granularity), so such a
+# listing is not trusted and is refreshed on the next walk
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+class _Listing(NamedTuple):
+    """Cached visible entries of one directory."""
+    mtime_ns: int
+    scanned_ns: int
+    subdirs: Tuple[str, ...]
+    files: Tuple[str, ...]
+
+
+class FileIndex:
+    """Directory listings under one root, revalidated per directory.
+    
+    Walks behave like os.walk with hidden entries pruned: subdirectories
+    are visited in sorted order, file names keep directory order, and
+    symlinked or ignored directories are not descended into.
+    """
+    
+    def __init__(self, root: str, ignored_dirs: AbstractSet[str] = frozenset()):
+        """Initialize an empty index.
+        
+        Args:
+            root: Absolute path of the directory to index.
+            ignored_dirs: Names of subdirectories to prune.
+        """
+        self.root = root
+        self.ignored_dirs = ignored_dirs
+        self._listings: dict[str, _Listing] = {}
+    
+    def walk(self, max_depth: Optional[int] = None) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        """Walk the indexed tree top-down, refreshing stale directories.
+        
+        Args:
+            max_depth: If given, do not descend more than this many levels
+                below the root.
+                
+        Yields:
+            (relative directory, visible file names) for every directory visited.
+        """
+        stack = [("", 0)]
+        while stack:
+            rel_dir, depth = stack.pop()
+            listing = self._get_listing(rel_dir)
+            if listing is None:
+                continue
+            
+            yield rel_dir, listing.files
+            
+            if max_depth is None or depth < max_depth:
+                stack.extend(
+                    (os.path.join(rel_dir, name), depth + 1)
+                    for name in reversed(listing.subdirs)
+                )
+    
+    def _get_listing(self, rel_dir: str) -> Optional[_Listing]:
+        """Return the listing of a directory, rescanning it if it changed.
+        
+        Returns None (and forgets the directory) if it can no longer be read.
+        """
+        dir_path = os.path.join(self.root, rel_dir)
+        cached = self._listings.get(rel_dir)
+        
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            if cached is not None:
+                self._forget(rel_dir)
+            return None
+        
+        if (
+            cached is not None
+            and cached.mtime_ns == mtime_ns
+            and mtime_ns + _RACY_WINDOW_NS < cached.scanned_ns
+        ):
+            return cached
+        
+        scanned_ns = time.time_ns()
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(entry.name)
+                    elif entry.name not in self.ignored_dirs and not entry.is_symlink():
+                        subdirs.append(entry.name)
+        except OSError:
+            if cached is not None:
+                self._forget(rel_dir)
+            return None
+        
+        listing = _Listing(mtime_ns, scanned_ns, tuple(sorted(subdirs)), tuple(files))
+        
+        if cached is not None:
+            for name in set(cached.subdirs).difference(listing.subdirs):
+                self._forget(os.path.join(rel_dir, name))
+        self._listings[rel_dir] = listing
+        return listing
+    
+    def _forget(self, rel_dir: str) -> None:
+        """Drop a directory and everything below it from the index."""
+        prefix = os.path.join(rel_dir, "") if rel_dir else ""
+        for key in [k for k in self._listings if k == rel_dir or k.startswith(prefix)]:
+            del self._listings[key]
+
+
+# Module-level indexes, keyed by absolute root path and ignored names
+_indexes: dict[Tuple[str, frozenset[str]], FileIndex] = {}
+
+
+def get_file_index(root: str, ignored_dirs: AbstractSet[str] = frozenset()) -> FileIndex:
+    """Get or create the index for a search root.
+    
+    Args:
+        root: Absolute path of the directory to search.
+        ignored_dirs: Names of subdirectories to prune.
+        
+    Returns:
+        The FileIndex for root.
+    """
+    key = (root, frozenset(ignored_dirs))
+    index = _indexes.get(key)
+    if index is None:
+        if len(_indexes) >= _MAX_INDEXES:
+            # Evict the least recently created index
+            del _indexes[next(iter(_indexes))]
+        index = _indexes[key] = FileIndex(root, key[1])
+    return index
+
+
+def clear_file_indexes() -> None:
+    """Discard all cached indexes."""
+    _indexes.clear()
@@ -5,14 +5,18 @@ diff-match-patch library for fuzzy matching, inspired by Aider's
 SEARCH/REPLACE block paradigm.
 """
 
+import os
 import re
-from pathlib import Path
-from typing import Optional, Tuple
-
-from diff_match_patch import diff_match_patch
+import secrets
+import stat
+from itertools import islice
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
 
 from ..config import get_config
 
+if TYPE_CHECKING:
+    from diff_match_patch import diff_match_patch
+
 
 # Fuzzy matching threshold (0.0 = exact match, 1.0 = match anything)
 # Lower values require closer matches
@@ -21,14 +25,118 @@ DEFAULT_MATCH_THRESHOLD = 0.4
 # Maximum distance from expected location to search for a match
 DEFAULT_MATCH_DISTANCE = 1000
 
+# Unified diff hunk header: @@ -old_start[,old_count] +new_start[,new_count] @@
+_HUNK_HEADER_PATTERN = re.compile(
+    r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@'
+)
+
+# Zero-width split point before every hunk header line
+_HUNK_SPLIT_PATTERN = re.compile(r'^(?=@@ )', re.MULTILINE)
+
+# Flags for creating _atomic_write's temporary file; O_EXCL makes the
+# random name safe to use
+_TEMP_FILE_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_CLOEXEC", 0)
+)
+
+# Runs of non-whitespace, i.e. the tokens joined by " ".join(text.split())
+_TOKEN_PATTERN = re.compile(r'\S+')
+
+
+class Hunk(NamedTuple):
+    """A single hunk of a unified diff."""
+    old_start: int  # Starting line in original file
+    old_count: int  # Number of lines in original
+    new_start: int  # Starting line in new file
+    new_count: int  # Number of lines in new version
+    lines: list[Tuple[str, str]]  # (operation, content) pairs
+
+
+def _find_ignoring_whitespace(
+    text: str,
+    pattern: str,
+    expected_location: int = 0
+) -> Optional[Tuple[int, int]]:
+    """Find a pattern in text, treating every whitespace run as one space.
+    
+    Both strings are collapsed with str.split/join and searched with
+    str.find, so a miss never leaves C code. Hits are mapped back to
+    offsets in the original text by token index; of several hits, the one
+    starting nearest expected_location wins (the earlier one on a tie).
+    """
+    collapsed_pattern = " ".join(pattern.split())
+    if not collapsed_pattern:
+        return None
+    
+    collapsed_text = " ".join(text.split())
+    best: Optional[Tuple[int, int]] = None
+    collapsed_start = collapsed_text.find(collapsed_pattern)
+    while collapsed_start != -1:
+        span = _map_collapsed_span(text, collapsed_text, collapsed_start, len(collapsed_pattern))
+        if best is None or abs(span[0] - expected_location) < abs(best[0] - expected_location):
+            best = span
+        # Hits are found in order, so later ones are only farther away
+        if span[0] >= expected_location:
+            break
+        collapsed_start = collapsed_text.find(collapsed_pattern, collapsed_start + 1)
+    
+    if best is None:
+        return None
+    start, end = best
+    
+    # Cover the indentation / line endings the pattern itself carries, so
+    # replacing whole lines doesn't leave stray whitespace behind
+    if pattern[0].isspace():
+        while start > 0 and text[start - 1] in " \t":
+            start -= 1
+        if pattern.startswith("\n") and text.endswith("\n", 0, start):
+            start -= 1
+    if pattern[-1].isspace():
+        while end < len(text) and text[end] in " \t":
+            end += 1
+        if pattern.endswith("\n") and text.startswith("\n", end):
+            end += 1
+    
+    return (start, end)
+
+
+def _map_collapsed_span(
+    text: str,
+    collapsed_text: str,
+    collapsed_start: int,
+    length: int
+) -> Tuple[int, int]:
+    """Map a span of " ".join(text.split()) back to offsets in text."""
+    collapsed_last = collapsed_start + length - 1
+    
+    # Token index and offset within the token for the first and last char
+    first_token = collapsed_text.count(" ", 0, collapsed_start)
+    first_offset = collapsed_start - (collapsed_text.rfind(" ", 0, collapsed_start) + 1)
+    last_token = collapsed_text.count(" ", 0, collapsed_last)
+    last_offset = collapsed_last - (collapsed_text.rfind(" ", 0, collapsed_last) + 1)
+    
+    tokens = islice(_TOKEN_PATTERN.finditer(text), first_token, last_token + 1)
+    first_match = next(tokens)
+    last_match = first_match
+    for last_match in tokens:
+        pass
+    return (first_match.start() + first_offset, last_match.start() + last_offset + 1)
+
 
 class FuzzyMatcher:
     """Fuzzy text matcher using diff-match-patch algorithm.
     
     This provides Aider-style fuzzy matching that can find text even
     when there are minor differences in whitespace or formatting.
+    Exact and whitespace-only differences are resolved with plain string
+    searches; diff-match-patch is imported and set up only when those
+    fail.
     """
     
+    # diff_match_patch instance shared by all matchers with default settings
+    _default_dmp: Optional["diff_match_patch"] = None
+    
     def __init__(
         self, 
         match_threshold: float = DEFAULT_MATCH_THRESHOLD,
@@ -40,9 +148,38 @@ class FuzzyMatcher:
             match_threshold: Matching threshold (0.0 = exact, 1.0 = loose).
             match_distance: Maximum distance to search from expected location.
         """
-        self.dmp = diff_match_patch()
-        self.dmp.Match_Threshold = match_threshold
-        self.dmp.Match_Distance = match_distance
+        self.match_threshold = match_threshold
+        self.match_distance = match_distance
+        self._dmp: Optional["diff_match_patch"] = None
+    
+    @property
+    def dmp(self) -> "diff_match_patch":
+        """The diff_match_patch instance, created on first use.
+        
+        Matchers with the default threshold and distance share a single
+        instance, so it must not be reconfigured through this attribute.
+        """
+        if self._dmp is None:
+            is_default = (
+                self.match_threshold == DEFAULT_MATCH_THRESHOLD
+                and self.match_distance == DEFAULT_MATCH_DISTANCE
+            )
+            if not is_default:
+                self._dmp = self._create_dmp()
+            else:
+                if FuzzyMatcher._default_dmp is None:
+                    FuzzyMatcher._default_dmp = self._create_dmp()
+                self._dmp = FuzzyMatcher._default_dmp
+        return self._dmp
+    
+    def _create_dmp(self) -> "diff_match_patch":
+        """Create a diff_match_patch instance with this matcher's settings."""
+        from diff_match_patch import diff_match_patch
+        
+        dmp = diff_match_patch()
+        dmp.Match_Threshold = self.match_threshold
+        dmp.Match_Distance = self.match_distance
+        return dmp
     
     def find_match(
         self, 
@@ -55,7 +192,9 @@ class FuzzyMatcher:
         Args:
             text: The text to search in.
             pattern: The pattern to find.
-            expected_location: Expected position (hint for faster matching).
+            expected_location: Expected position. An exact match is always
+                the first occurrence; among inexact matches, the one
+                nearest this position is used.
             
         Returns:
             Tuple of (start, end) positions if found, None otherwise.
@@ -68,6 +207,20 @@ class FuzzyMatcher:
         if exact_pos != -1:
             return (exact_pos, exact_pos + len(pattern))
         
+        return self._find_inexact_match(text, pattern, expected_location)
+    
+    def _find_inexact_match(
+        self, 
+        text: str, 
+        pattern: str, 
+        expected_location: int = 0
+    ) -> Optional[Tuple[int, int]]:
+        """Find a match for a pattern that does not occur verbatim in text."""
+        # Try a match that differs only in whitespace
+        whitespace_match = _find_ignoring_whitespace(text, pattern, expected_location)
+        if whitespace_match is not None:
+            return whitespace_match
+        
         # Try fuzzy matching
         match_start = self.dmp.match_main(text, pattern, expected_location)
         
@@ -118,7 +271,17 @@ class FuzzyMatcher:
         Returns:
             Tuple of (modified text, whether a match was found).
         """
-        match = self.find_match(text, search, expected_location)
+        if not search:
+            return (text, False)
+        
+        # Exact hits are spliced in directly without the fuzzy machinery
+        exact_pos = text.find(search)
+        if exact_pos != -1:
+            if search == replace:
+                return (text, True)
+            return (text[:exact_pos] + replace + text[exact_pos + len(search):], True)
+        
+        match = self._find_inexact_match(text, search, expected_location)
         
         if match is None:
             return (text, False)
@@ -128,6 +291,67 @@ class FuzzyMatcher:
         return (new_text, True)
 
 
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file."""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _atomic_write(path: str, data: str | bytes) -> None:
+    """Replace a file's contents atomically.
+    
+    The data goes to a temporary file in the same directory, which is then
+    renamed over the target, so the file is never seen truncated or
+    half-written. The original file's permission bits are kept; a new file
+    gets the default 0o666 minus umask. If the directory is not writable
+    but the file is, the file is rewritten in place instead, without the
+    atomicity guarantee.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    
+    try:
+        fd, tmp_path = _create_temp_file(path)
+    except PermissionError:
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _create_temp_file(path: str) -> Tuple[int, str]:
+    """Create a new, uniquely named file next to path.
+    
+    Unlike tempfile.mkstemp, which always uses mode 0o600, the file is
+    created with 0o666 so the umask applies as it does for any new file.
+    
+    Returns:
+        The open file descriptor and the temporary file's path.
+    """
+    directory, name = os.path.split(path)
+    for _ in range(100):
+        tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(tmp_path, _TEMP_FILE_FLAGS, 0o666), tmp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No unused temporary file name next to {path}")
+
+
 def search_replace(file_path: str, search: str, replace: str) -> str:
     """Replace text in a file using fuzzy matching.
     
@@ -148,15 +372,15 @@ def search_replace(file_path: str, search: str, replace: str) -> str:
         ValueError: If no match is found or path is invalid.
     """
     config = get_config()
-    resolved_path = config.resolve_path(file_path)
+    resolved_path = os.fspath(config.resolve_path(file_path))
     
-    if not resolved_path.exists():
+    if not os.path.exists(resolved_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    if not resolved_path.is_file():
+    if not os.path.isfile(resolved_path):
         raise ValueError(f"Path is not a file: {file_path}")
     
-    content = resolved_path.read_text(encoding="utf-8")
+    content = _read_text(resolved_path)
     
     matcher = FuzzyMatcher()
     new_content, found = matcher.apply_replacement(content, search, replace)
@@ -169,7 +393,7 @@ def search_replace(file_path: str, search: str, replace: str) -> str:
             f"Search text begins with: {repr(search_preview)}"
         )
     
-    resolved_path.write_text(new_content, encoding="utf-8")
+    _atomic_write(resolved_path, new_content)
     
     # Calculate change statistics
     lines_removed = search.count('\n') + 1
@@ -186,6 +410,9 @@ def search_replace_all(file_path: str, search: str, replace: str) -> str:
     
     Unlike search_replace which replaces only the first match,
     this replaces all occurrences (using exact matching for safety).
+    Files with only plain newlines are edited as raw UTF-8 bytes; files
+    containing carriage returns are read in text mode, like search_replace,
+    so a multi-line search matches CRLF line endings.
     
     Args:
         file_path: Path to the file to modify.
@@ -196,19 +423,30 @@ def search_replace_all(file_path: str, search: str, replace: str) -> str:
         A message describing what was changed.
     """
     config = get_config()
-    resolved_path = config.resolve_path(file_path)
+    resolved_path = os.fspath(config.resolve_path(file_path))
     
-    if not resolved_path.exists():
+    if not os.path.exists(resolved_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    content = resolved_path.read_text(encoding="utf-8")
+    with open(resolved_path, "rb") as f:
+        raw = f.read()
+    
+    new_content: str | bytes
+    if b"\r" in raw:
+        # Text mode normalizes line endings, so "a\nb" matches "a\r\nb"
+        text = _read_text(resolved_path)
+        count = text.count(search) if search else 0
+        new_content = text.replace(search, replace)
+    else:
+        # UTF-8 is self-synchronizing, so byte matches are exactly text matches
+        needle = search.encode("utf-8")
+        count = raw.count(needle) if needle else 0
+        new_content = raw.replace(needle, replace.encode("utf-8"))
     
-    count = content.count(search)
     if count == 0:
         raise ValueError(f"Text not found in {file_path}")
     
-    new_content = content.replace(search, replace)
-    resolved_path.write_text(new_content, encoding="utf-8")
+    _atomic_write(resolved_path, new_content)
     
     return f"Replaced {count} occurrence(s) in {file_path}"
 
@@ -230,12 +468,12 @@ def apply_diff(file_path: str, diff: str) -> str:
         ValueError: If the patch cannot be applied cleanly.
     """
     config = get_config()
-    resolved_path = config.resolve_path(file_path)
+    resolved_path = os.fspath(config.resolve_path(file_path))
     
-    if not resolved_path.exists():
+    if not os.path.exists(resolved_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    content = resolved_path.read_text(encoding="utf-8")
+    content = _read_text(resolved_path)
     lines = content.splitlines(keepends=True)
     
     # Parse the unified diff
@@ -244,11 +482,13 @@ def apply_diff(file_path: str, diff: str) -> str:
     if not hunks:
         raise ValueError("No valid hunks found in diff")
     
-    # Apply hunks in reverse order to preserve line numbers
-    new_lines = list(lines)
+    # Apply hunks bottom-up so earlier hunks' line numbers stay valid,
+    # even if the diff lists them out of order
+    hunks.sort(key=lambda hunk: hunk.old_start, reverse=True)
+    new_lines = lines
     applied_count = 0
     
-    for hunk in reversed(hunks):
+    for hunk in hunks:
         try:
             new_lines = _apply_hunk(new_lines, hunk)
             applied_count += 1
@@ -256,7 +496,7 @@ def apply_diff(file_path: str, diff: str) -> str:
             raise ValueError(f"Failed to apply hunk: {e}")
     
     new_content = "".join(new_lines)
-    resolved_path.write_text(new_content, encoding="utf-8")
+    _atomic_write(resolved_path, new_content)
     
     return f"Applied {applied_count} hunk(s) to {file_path}"
 
@@ -273,12 +513,12 @@ def insert_at_line(file_path: str, line_number: int, content: str) -> str:
         A message describing what was changed.
     """
     config = get_config()
-    resolved_path = config.resolve_path(file_path)
+    resolved_path = os.fspath(config.resolve_path(file_path))
     
-    if not resolved_path.exists():
+    if not os.path.exists(resolved_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    file_content = resolved_path.read_text(encoding="utf-8")
+    file_content = _read_text(resolved_path)
     lines = file_content.splitlines(keepends=True)
     
     # Ensure content ends with newline
@@ -289,19 +529,20 @@ def insert_at_line(file_path: str, line_number: int, content: str) -> str:
     
     # Handle edge cases
     if line_number <= 0:
-        new_lines = content_lines + lines
+        idx = 0
     elif line_number > len(lines):
         # Append at end
         if lines and not lines[-1].endswith('\n'):
             lines[-1] += '\n'
-        new_lines = lines + content_lines
+        idx = len(lines)
     else:
         # Insert at specified line (1-indexed)
         idx = line_number - 1
-        new_lines = lines[:idx] + content_lines + lines[idx:]
     
-    new_content = "".join(new_lines)
-    resolved_path.write_text(new_content, encoding="utf-8")
+    lines[idx:idx] = content_lines
+    
+    new_content = "".join(lines)
+    _atomic_write(resolved_path, new_content)
     
     return f"Inserted {len(content_lines)} line(s) at line {line_number} in {file_path}"
 
@@ -317,16 +558,17 @@ def delete_lines(file_path: str, start_line: int, end_line: int) -> str:
     Returns:
         A message describing what was changed.
     """
+    # Reject bad ranges before touching the filesystem
+    if start_line < 1 or end_line < start_line:
+        raise ValueError(f"Invalid line range: {start_line}-{end_line}")
+    
     config = get_config()
-    resolved_path = config.resolve_path(file_path)
+    resolved_path = os.fspath(config.resolve_path(file_path))
     
-    if not resolved_path.exists():
+    if not os.path.exists(resolved_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    if start_line < 1 or end_line < start_line:
-        raise ValueError(f"Invalid line range: {start_line}-{end_line}")
-    
-    content = resolved_path.read_text(encoding="utf-8")
+    content = _read_text(resolved_path)
     lines = content.splitlines(keepends=True)
     
     if start_line > len(lines):
@@ -339,102 +581,75 @@ def delete_lines(file_path: str, start_line: int, end_line: int) -> str:
     del lines[start_line - 1:end_line]
     
     new_content = "".join(lines)
-    resolved_path.write_text(new_content, encoding="utf-8")
+    _atomic_write(resolved_path, new_content)
     
     deleted_count = end_line - start_line + 1
     return f"Deleted {deleted_count} line(s) from {file_path}"
 
 
-def _parse_unified_diff(diff: str) -> list[dict]:
-    """Parse a unified diff into hunks.
+def _parse_unified_diff(diff: str) -> list[Hunk]:
+    """Parse a unified diff into a list of Hunks.
     
-    Returns a list of hunk dictionaries with:
-    - old_start: Starting line in original file
-    - old_count: Number of lines in original
-    - new_start: Starting line in new file
-    - new_count: Number of lines in new version
-    - lines: List of (operation, content) tuples
+    Hunk lines are (operation, content) tuples where operation is one
+    of 'context', 'delete' or 'add'.
     """
-    hunks = []
-    current_hunk = None
-    
-    hunk_header_pattern = re.compile(
-        r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@'
-    )
-    
-    for line in diff.splitlines(keepends=True):
-        # Check for hunk header
-        match = hunk_header_pattern.match(line)
-        if match:
-            if current_hunk:
-                hunks.append(current_hunk)
-            
-            old_start = int(match.group(1))
-            old_count = int(match.group(2)) if match.group(2) else 1
-            new_start = int(match.group(3))
-            new_count = int(match.group(4)) if match.group(4) else 1
-            
-            current_hunk = {
-                'old_start': old_start,
-                'old_count': old_count,
-                'new_start': new_start,
-                'new_count': new_count,
-                'lines': []
-            }
+    hunks: list[Hunk] = []
+    
+    # Everything before the first hunk header is file headers; each
+    # remaining chunk starts with its own hunk header line
+    for chunk in _HUNK_SPLIT_PATTERN.split(diff)[1:]:
+        header, _, body = chunk.partition('\n')
+        match = _HUNK_HEADER_PATTERN.match(header)
+        if not match:
             continue
         
-        # Skip diff header lines
-        if line.startswith('---') or line.startswith('+++'):
-            continue
-        if line.startswith('diff ') or line.startswith('index '):
-            continue
+        old_start = int(match.group(1))
+        old_count = int(match.group(2)) if match.group(2) else 1
+        new_start = int(match.group(3))
+        new_count = int(match.group(4)) if match.group(4) else 1
         
-        # Process hunk content
-        if current_hunk is not None:
+        hunk_lines: list[Tuple[str, str]] = []
+        
+        for line in body.splitlines(keepends=True):
+            # Skip diff header lines
+            if line.startswith('---') or line.startswith('+++'):
+                continue
+            if line.startswith('diff ') or line.startswith('index '):
+                continue
+            
             if line.startswith('-'):
-                current_hunk['lines'].append(('delete', line[1:]))
+                hunk_lines.append(('delete', line[1:]))
             elif line.startswith('+'):
-                current_hunk['lines'].append(('add', line[1:]))
+                hunk_lines.append(('add', line[1:]))
             elif line.startswith(' ') or line == '\n':
                 content = line[1:] if line.startswith(' ') else line
-                current_hunk['lines'].append(('context', content))
-    
-    if current_hunk:
-        hunks.append(current_hunk)
+                hunk_lines.append(('context', content))
+        
+        hunks.append(Hunk(old_start, old_count, new_start, new_count, hunk_lines))
     
     return hunks
 
 
-def _apply_hunk(lines: list[str], hunk: dict) -> list[str]:
-    """Apply a single hunk to a list of lines."""
-    result = []
-    line_idx = 0
-    hunk_start = hunk['old_start'] - 1  # Convert to 0-indexed
+def _apply_hunk(lines: list[str], hunk: Hunk) -> list[str]:
+    """Apply a single hunk to a list of lines.
     
-    # Copy lines before the hunk
-    result.extend(lines[:hunk_start])
+    Only the hunk body is assembled line by line; the unchanged lines
+    before and after it are copied as slices.
+    """
+    hunk_start = max(hunk.old_start - 1, 0)  # Convert to 0-indexed
     line_idx = hunk_start
+    body: list[str] = []
     
-    # Apply the hunk
-    for op, content in hunk['lines']:
+    for op, content in hunk.lines:
         if op == 'context':
-            # Verify context matches (fuzzy)
-            if line_idx < len(lines):
-                result.append(lines[line_idx])
-                line_idx += 1
-            else:
-                result.append(content)
+            # Keep the file's own version of context lines
+            body.append(lines[line_idx] if line_idx < len(lines) else content)
+            line_idx += 1
         elif op == 'delete':
             # Skip the deleted line
             line_idx += 1
         elif op == 'add':
             # Add the new line
-            if not content.endswith('\n'):
-                content += '\n'
-            result.append(content)
+            body.append(content if content.endswith('\n') else content + '\n')
     
-    # Copy remaining lines
-    result.extend(lines[line_idx:])
-    
-    return result
-
+    return lines[:hunk_start] + body + lines[line_idx:]
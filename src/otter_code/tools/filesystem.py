@@ -7,10 +7,29 @@ filesystem in a controlled manner, respecting the configured project boundaries.
 import fnmatch
 import os
 import re
-from pathlib import Path
-from typing import Optional
+import stat
+from functools import lru_cache
+from typing import AbstractSet, Callable, Iterator, Optional, Tuple
 
 from ..config import get_config
+from ._index import get_file_index
+
+
+# Flags for creating or truncating a file for writing
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+
+# Largest single os.write call in write_file_bytes
+_WRITE_CHUNK_SIZE = 1 << 20
+
+# find_in_files does not open files with these extensions (matched
+# case-insensitively); their contents are not searchable text
+_BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip', '.gz', '.tar', '.whl',
+    '.pyc', '.so', '.dylib', '.exe', '.bin',
+})
+
+# Units for _format_size, indexed by power of 1024
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 
 def read_file(path: str) -> str:
@@ -27,15 +46,18 @@ def read_file(path: str) -> str:
         ValueError: If the path is outside allowed boundaries.
     """
     config = get_config()
-    resolved_path = config.resolve_path(path)
+    resolved_path = os.fspath(config.resolve_path(path))
     
-    if not resolved_path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
+    try:
+        st = os.stat(resolved_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileNotFoundError(f"File not found: {path}") from None
     
-    if not resolved_path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         raise ValueError(f"Path is not a file: {path}")
     
-    return resolved_path.read_text(encoding="utf-8")
+    with open(resolved_path, encoding="utf-8") as f:
+        return f.read()
 
 
 def write_file(path: str, content: str) -> str:
@@ -49,19 +71,70 @@ def write_file(path: str, content: str) -> str:
         A confirmation message indicating success.
         
     Raises:
+        TypeError: If content is not a string.
         ValueError: If the path is outside allowed boundaries.
     """
-    config = get_config()
-    resolved_path = config.resolve_path(path)
+    # Reject bad input before the file is opened (and truncated)
+    if not isinstance(content, str):
+        raise TypeError(f"content must be str, not {type(content).__name__}")
     
-    # Create parent directories if they don't exist
-    resolved_path.parent.mkdir(parents=True, exist_ok=True)
+    config = get_config()
+    fd = _open_for_write(os.fspath(config.resolve_path(path)))
     
-    resolved_path.write_text(content, encoding="utf-8")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
     
     return f"Successfully wrote {len(content)} characters to {path}"
 
 
+def write_file_bytes(path: str, data: bytes) -> str:
+    """Write binary data to a file, creating it if it doesn't exist.
+    
+    Unlike write_file this is not exposed as an agent tool. The data goes
+    straight to os.write in chunks, without a text layer or encode pass.
+    
+    Args:
+        path: Path to the file to write. Can be relative to project root or absolute.
+        data: Any bytes-like object (bytes, bytearray, memoryview, ...).
+        
+    Returns:
+        A confirmation message indicating success.
+        
+    Raises:
+        TypeError: If data does not support the buffer protocol.
+        ValueError: If the path is outside allowed boundaries.
+    """
+    # Building the view first rejects bad input before the file is truncated
+    with memoryview(data) as view, view.cast("B") as chunks:
+        config = get_config()
+        fd = _open_for_write(os.fspath(config.resolve_path(path)))
+        
+        # os.write may write less than asked, so advance by what was written
+        try:
+            size = len(chunks)
+            offset = 0
+            while offset < size:
+                offset += os.write(fd, chunks[offset:offset + _WRITE_CHUNK_SIZE])
+        finally:
+            os.close(fd)
+    
+    return f"Successfully wrote {size} bytes to {path}"
+
+
+def _open_for_write(resolved_path: str) -> int:
+    """Open a file for writing, creating parent directories on demand.
+    
+    Returns:
+        A file descriptor for the truncated file.
+    """
+    # Open first; parent directories are only created if that fails
+    try:
+        return os.open(resolved_path, _WRITE_FLAGS, 0o666)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(resolved_path), exist_ok=True)
+        return os.open(resolved_path, _WRITE_FLAGS, 0o666)
+
+
 def list_directory(path: str = ".", recursive: bool = False) -> str:
     """List contents of a directory.
     
@@ -76,49 +149,159 @@ def list_directory(path: str = ".", recursive: bool = False) -> str:
         ValueError: If the path is outside allowed boundaries or not a directory.
     """
     config = get_config()
-    resolved_path = config.resolve_path(path)
+    resolved_path = os.fspath(config.resolve_path(path))
     
-    if not resolved_path.exists():
-        raise FileNotFoundError(f"Directory not found: {path}")
+    _require_directory(resolved_path, path)
     
-    if not resolved_path.is_dir():
+    entries = []
+    _list_entries(resolved_path, "", recursive, entries, config.ignored_dirs)
+    
+    if not entries:
+        return f"Directory '{path}' is empty"
+    
+    return "\n".join(entries)
+
+
+def _require_directory(resolved_path: str, path: str) -> None:
+    """Check with a single stat that a resolved path is an existing directory.
+    
+    Raises:
+        FileNotFoundError: If the path does not exist.
+        ValueError: If the path is not a directory.
+    """
+    try:
+        st = os.stat(resolved_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileNotFoundError(f"Directory not found: {path}") from None
+    
+    if not stat.S_ISDIR(st.st_mode):
         raise ValueError(f"Path is not a directory: {path}")
+
+
+def _list_entries(
+    dir_path: str,
+    rel_dir: str,
+    recursive: bool,
+    entries: list[str],
+    ignored_dirs: AbstractSet[str] = frozenset()
+) -> None:
+    """Append formatted listing lines for a directory.
     
-    entries = []
+    Uses a single os.scandir pass per directory; entry types come from the
+    directory stream, so only files are stat'ed (for their size). Hidden
+    entries are skipped before their type is looked at. Recursive listings
+    show each directory's subdirectories, then its files, then descend
+    into the subdirectories. Symlinked directories and those named in
+    ignored_dirs are listed but not descended into.
+    """
+    with os.scandir(dir_path) as it:
+        visible = sorted(
+            (entry for entry in it if not entry.name.startswith('.')),
+            key=lambda entry: entry.name,
+        )
     
-    if recursive:
-        for root, dirs, files in os.walk(resolved_path):
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
-            
-            rel_root = Path(root).relative_to(resolved_path)
-            
-            for d in sorted(dirs):
-                rel_path = rel_root / d if str(rel_root) != '.' else Path(d)
-                entries.append(f"[DIR]  {rel_path}/")
-            
-            for f in sorted(files):
-                if f.startswith('.'):
-                    continue
-                rel_path = rel_root / f if str(rel_root) != '.' else Path(f)
-                file_path = Path(root) / f
-                size = file_path.stat().st_size
-                entries.append(f"[FILE] {rel_path} ({_format_size(size)})")
-    else:
-        for entry in sorted(resolved_path.iterdir()):
-            if entry.name.startswith('.'):
-                continue
-            
+    if not recursive:
+        for entry in visible:
             if entry.is_dir():
                 entries.append(f"[DIR]  {entry.name}/")
             else:
-                size = entry.stat().st_size
-                entries.append(f"[FILE] {entry.name} ({_format_size(size)})")
+                entries.append(f"[FILE] {entry.name} ({_format_size(entry.stat().st_size)})")
+        return
     
-    if not entries:
-        return f"Directory '{path}' is empty"
+    dirs = [entry for entry in visible if entry.is_dir()]
+    files = [entry for entry in visible if not entry.is_dir()]
     
-    return "\n".join(entries)
+    for entry in dirs:
+        entries.append(f"[DIR]  {rel_dir}{entry.name}/")
+    for entry in files:
+        entries.append(f"[FILE] {rel_dir}{entry.name} ({_format_size(entry.stat().st_size)})")
+    
+    for entry in dirs:
+        if entry.name in ignored_dirs or entry.is_symlink():
+            continue
+        try:
+            _list_entries(
+                entry.path, f"{rel_dir}{entry.name}{os.sep}", True, entries, ignored_dirs
+            )
+        except OSError:
+            # Unreadable subdirectories are skipped, as os.walk does
+            continue
+
+
+@lru_cache(maxsize=128)
+def _compile_glob(pattern: str) -> Callable[[str], object]:
+    """Compile a single glob path segment to a name predicate.
+    
+    The common shapes "*.ext", "prefix*" and literal names are checked with
+    str.endswith, str.startswith and ==; anything else falls back to the
+    fnmatch regex.
+    """
+    if not any(c in pattern for c in '?['):
+        star_count = pattern.count('*')
+        if star_count == 0:
+            return pattern.__eq__
+        if star_count == 1:
+            if pattern.startswith('*'):
+                suffix = pattern[1:]
+                return lambda name: name.endswith(suffix)
+            if pattern.endswith('*'):
+                prefix = pattern[:-1]
+                return lambda name: name.startswith(prefix)
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+@lru_cache(maxsize=128)
+def _compile_search_regex(pattern: str) -> re.Pattern:
+    """Compile a find_in_files regex (applied to one line at a time)."""
+    return re.compile(pattern)
+
+
+def _iter_glob_matches(
+    root: str,
+    pattern: str,
+    recursive: bool,
+    ignored_dirs: AbstractSet[str] = frozenset()
+):
+    """Find visible files under root matching a glob pattern.
+    
+    Args:
+        root: Directory to search.
+        pattern: Glob pattern; "/" separates path segments and "**/" is
+            ignored (use recursive to match at any depth).
+        recursive: If True, match the pattern's segments against the tail
+            of paths at any depth (like rglob). Otherwise the pattern is
+            anchored at root (like glob).
+        ignored_dirs: Names of subdirectories not to descend into.
+        
+    Yields:
+        Matching file paths relative to root.
+    """
+    parts = pattern.replace("**/", "").split("/")
+    if parts[-1] == "":
+        # A trailing "/" only matches directories, as with pathlib
+        return
+    # "." and empty segments ("./*.py", "src//*.py") name no level of their own
+    segments = [_compile_glob(part) for part in parts if part not in ("", ".")]
+    if not segments:
+        return
+    dir_segments, name_segment = segments[:-1], segments[-1]
+    max_depth = None if recursive else len(dir_segments)
+    
+    for rel_dir, filenames in get_file_index(root, ignored_dirs).walk(max_depth):
+        # Directory components are matched once per directory, not per file
+        dir_parts = rel_dir.split(os.sep) if rel_dir else []
+        if recursive:
+            if len(dir_parts) < len(dir_segments):
+                continue
+            dir_parts = dir_parts[len(dir_parts) - len(dir_segments):]
+        elif len(dir_parts) != len(dir_segments):
+            continue
+        if not all(seg(part) for seg, part in zip(dir_segments, dir_parts)):
+            continue
+        
+        for name in filenames:
+            if name_segment(name):
+                yield os.path.join(rel_dir, name)
 
 
 def search_files(pattern: str, path: str = ".") -> str:
@@ -135,27 +318,15 @@ def search_files(pattern: str, path: str = ".") -> str:
         ValueError: If the path is outside allowed boundaries.
     """
     config = get_config()
-    resolved_path = config.resolve_path(path)
+    resolved_path = os.fspath(config.resolve_path(path))
     
-    if not resolved_path.exists():
-        raise FileNotFoundError(f"Directory not found: {path}")
+    _require_directory(resolved_path, path)
     
-    if not resolved_path.is_dir():
-        raise ValueError(f"Path is not a directory: {path}")
-    
-    matches = []
-    
-    # Use rglob for recursive patterns, glob otherwise
-    if "**" in pattern:
-        for match in resolved_path.rglob(pattern.replace("**/", "")):
-            if match.is_file() and not any(p.startswith('.') for p in match.parts):
-                rel_path = match.relative_to(resolved_path)
-                matches.append(str(rel_path))
-    else:
-        for match in resolved_path.glob(pattern):
-            if match.is_file() and not match.name.startswith('.'):
-                rel_path = match.relative_to(resolved_path)
-                matches.append(str(rel_path))
+    # "**/" makes the pattern match at any depth (like rglob); otherwise
+    # it is anchored at the search directory (like glob)
+    matches = list(_iter_glob_matches(
+        resolved_path, pattern, "**" in pattern, config.ignored_dirs
+    ))
     
     if not matches:
         return f"No files matching '{pattern}' found in '{path}'"
@@ -186,75 +357,228 @@ def find_in_files(
         ValueError: If the path is outside allowed boundaries or regex is invalid.
     """
     config = get_config()
-    resolved_path = config.resolve_path(path)
-    
-    if not resolved_path.exists():
-        raise FileNotFoundError(f"Directory not found: {path}")
+    root = os.fspath(config.resolve_path(path))
     
-    if not resolved_path.is_dir():
-        raise ValueError(f"Path is not a directory: {path}")
+    _require_directory(root, path)
     
+    compiled_pattern = None
     if regex:
         try:
-            compiled_pattern = re.compile(pattern)
+            compiled_pattern = _compile_search_regex(pattern)
         except re.error as e:
             raise ValueError(f"Invalid regex pattern: {e}")
     
-    results = []
-    files_searched = 0
+    # Find all matching files (file_pattern matches at any depth, like rglob)
+    rel_paths = list(_iter_glob_matches(
+        root, file_pattern, recursive=True, ignored_dirs=config.ignored_dirs
+    ))
     
-    # Find all matching files
-    for file_path in resolved_path.rglob(file_pattern):
-        if not file_path.is_file():
-            continue
-        if any(p.startswith('.') for p in file_path.parts):
-            continue
+    parts = []
+    files_matched = 0
+    
+    for rel_path, lines, match_lines in _iter_matches(
+        root, rel_paths, pattern, compiled_pattern, config.max_search_file_size
+    ):
+        files_matched += 1
         
-        files_searched += 1
+        parts.append(f"\n{rel_path}:")
+        for line_num in match_lines:
+            # Add context lines if requested
+            if context_lines > 0:
+                start = max(0, line_num - 1 - context_lines)
+                end = min(len(lines), line_num + context_lines)
+                for ctx_num in range(start, end):
+                    prefix = ">" if ctx_num == line_num - 1 else " "
+                    parts.append(f"  {prefix} {ctx_num + 1}: {lines[ctx_num]}")
+                parts.append("")  # Separator
+            else:
+                parts.append(f"  {line_num}: {lines[line_num - 1].strip()}")
+    
+    if not parts:
+        return f"No matches for '{pattern}' found in {len(rel_paths)} files"
+    
+    header = f"Found matches in {files_matched} files:"
+    return header + "\n" + "\n".join(parts)
+
+
+def _iter_matches(
+    root: str,
+    rel_paths: list[str],
+    pattern: str,
+    compiled_pattern: Optional[re.Pattern] = None,
+    max_size: Optional[int] = None
+) -> Iterator[Tuple[str, list[str], list[int]]]:
+    """Search files under root for find_in_files.
+    
+    Yields:
+        (relative path, the file's lines, 1-based matching line numbers)
+        for every file with at least one match.
+    """
+    for rel_path in rel_paths:
+        scan_result = _scan_file(
+            os.path.join(root, rel_path), pattern, compiled_pattern, max_size
+        )
+        if scan_result is not None:
+            yield (rel_path, *scan_result)
+
+
+def _scan_file(
+    file_path: str,
+    pattern: str,
+    compiled_pattern: Optional[re.Pattern] = None,
+    max_size: Optional[int] = None
+) -> Optional[Tuple[list[str], list[int]]]:
+    """Search one file for find_in_files.
+    
+    Files with a known binary extension are skipped without being opened,
+    and files larger than max_size without being read.
+    
+    Returns:
+        The file's lines and the 1-based numbers of the matching lines, or
+        None if the file is skipped, unsearchable or has no match.
+    """
+    if os.path.splitext(file_path)[1].lower() in _BINARY_EXTENSIONS:
+        return None
+    
+    content = _read_searchable_text(file_path, max_size)
+    if content is None:
+        return None
+    
+    if compiled_pattern is not None:
+        # Regexes run line by line so that \s, [^...] and the like cannot
+        # match across a newline and report the wrong line
+        lines = _split_lines(content)
+        search = compiled_pattern.search
+        match_lines = [i for i, line in enumerate(lines, 1) if search(line)]
+        if not match_lines:
+            return None
+        return lines, match_lines
+    
+    match_lines = _find_matching_lines(content, pattern)
+    if not match_lines:
+        return None
+    return _split_lines(content), match_lines
+
+
+def _split_lines(content: str) -> list[str]:
+    """Split normalized text into lines without a trailing empty line."""
+    lines = content.split('\n')
+    if content.endswith('\n'):
+        lines.pop()
+    return lines
+
+
+def _read_bytes(file_path: str, max_size: Optional[int] = None) -> Optional[bytes]:
+    """Read a whole file with raw descriptor calls.
+    
+    Sizes the read from ``fstat`` so a regular file is normally consumed
+    by a single ``read`` call, without the buffered-IO object, TTY probe
+    and seek that ``open(..., 'rb').read()`` adds for every file.
+    
+    Args:
+        file_path: Absolute path of the file to read.
+        max_size: If given, files reported larger than this many bytes
+            are not read.
         
-        try:
-            content = file_path.read_text(encoding="utf-8")
-        except (UnicodeDecodeError, PermissionError):
-            continue
+    Returns:
+        The file contents, or None if the file exceeds max_size.
+        
+    Raises:
+        OSError: If the file cannot be opened or read.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if max_size is not None and size > max_size:
+            return None
+        # Ask for one byte more than the reported size so a file that grew
+        # since fstat is noticed without an extra EOF probe in the common case.
+        size += 1
+        data = os.read(fd, size)
+        if len(data) < size:
+            return data
+        chunks = [data]
+        while True:
+            chunk = os.read(fd, 1 << 20)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+def _read_searchable_text(file_path: str, max_size: Optional[int] = None) -> Optional[str]:
+    """Read a file for content search.
+    
+    Returns None for unreadable files, files larger than max_size, files
+    that look binary (a NUL byte near the start) and files that are not
+    valid UTF-8. Line endings are
+    normalized to plain newlines as in text mode.
+    """
+    try:
+        data = _read_bytes(file_path, max_size)
+    except OSError:
+        return None
+    
+    if data is None:
+        return None
+    
+    if b'\x00' in data[:8192]:
+        return None
+    
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _find_matching_lines(text: str, pattern: str) -> list[int]:
+    """Find the 1-based numbers of lines containing a literal pattern.
+    
+    The whole text is scanned with str.find instead of being split into
+    lines first; line numbers are counted only up to each hit. After a hit
+    the search resumes at the next line, so every line is reported at most
+    once. A pattern containing a newline never matches, as no single line
+    can contain it.
+    """
+    if '\n' in pattern:
+        return []
+    
+    line_numbers = []
+    line_num = 1
+    counted_to = 0
+    pos = 0
+    
+    while True:
+        start = text.find(pattern, pos)
+        if start == -1:
+            break
         
-        lines = content.splitlines()
-        rel_path = file_path.relative_to(resolved_path)
-        file_matches = []
+        # An empty match after the final newline is not on a real line
+        if start == len(text) and (not text or text.endswith('\n')):
+            break
         
-        for i, line in enumerate(lines, 1):
-            if regex:
-                if compiled_pattern.search(line):
-                    file_matches.append((i, line))
-            else:
-                if pattern in line:
-                    file_matches.append((i, line))
+        line_num += text.count('\n', counted_to, start)
+        line_numbers.append(line_num)
         
-        if file_matches:
-            results.append(f"\n{rel_path}:")
-            for line_num, line_content in file_matches:
-                # Add context lines if requested
-                if context_lines > 0:
-                    start = max(0, line_num - 1 - context_lines)
-                    end = min(len(lines), line_num + context_lines)
-                    for ctx_num in range(start, end):
-                        prefix = ">" if ctx_num == line_num - 1 else " "
-                        results.append(f"  {prefix} {ctx_num + 1}: {lines[ctx_num]}")
-                    results.append("")  # Separator
-                else:
-                    results.append(f"  {line_num}: {line_content.strip()}")
-    
-    if not results:
-        return f"No matches for '{pattern}' found in {files_searched} files"
-    
-    header = f"Found matches in {len([r for r in results if r.startswith('\\n')])} files:"
-    return header + "".join(results)
+        line_end = text.find('\n', start)
+        if line_end == -1:
+            break
+        pos = counted_to = line_end + 1
+        line_num += 1
+    
+    return line_numbers
 
 
 def _format_size(size: int) -> str:
     """Format a file size in human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024:
-            return f"{size:.1f}{unit}" if unit != 'B' else f"{size}{unit}"
-        size /= 1024
-    return f"{size:.1f}TB"
+    if size < 1024:
+        return f"{size}B"
+    # Each unit is 2**10 of the previous one, so bit_length picks it directly
+    exponent = min((size.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * exponent)):.1f}{_SIZE_UNITS[exponent]}"
 
@@ -7,11 +7,13 @@ The backends use SWE-ReX (SWE-agent Remote Execution) for robust persistent
 shell sessions with proper command completion detection.
 """
 
+import base64
+import posixpath
+import re
 from typing import Optional, Tuple, Protocol, runtime_checkable
 
 from ..config import get_config, ShellBackend
-from ..backends.shell_local import LocalShellBackend, get_local_shell, close_local_shell
-from ..backends.shell_docker import DockerShellBackend, get_docker_shell, close_docker_shell
+from ..backends.shell_local import get_local_shell, close_local_shell
 
 
 @runtime_checkable
@@ -29,17 +31,58 @@ class ShellBackendProtocol(Protocol):
 # Current active shell backend
 _current_backend: Optional[ShellBackendProtocol] = None
 
+# Last known working directory of the shell session (None = unknown)
+_cwd_cache: Optional[str] = None
+
+# Commands that may move the shell to a different working directory
+_CWD_CHANGE_PATTERN = re.compile(r'\b(cd|pushd|popd)\b')
+
+
+def _invalidate_cwd_if_changed(command: str) -> None:
+    """Forget the cached working directory if a command may have changed it."""
+    global _cwd_cache
+    
+    if _cwd_cache is not None and _CWD_CHANGE_PATTERN.search(command):
+        _cwd_cache = None
+
+
+def _is_valid_cwd(path: str) -> bool:
+    """Check that a reported working directory is a single absolute path."""
+    return posixpath.isabs(path) and "\n" not in path
+
+
+def _current_working_directory(backend: ShellBackendProtocol) -> str:
+    """Get the shell's working directory, caching it only if pwd succeeded.
+    
+    Raises:
+        RuntimeError: If pwd fails or doesn't report an absolute path.
+    """
+    global _cwd_cache
+    
+    if _cwd_cache is None:
+        output, exit_code = backend.run("pwd")
+        cwd = output.strip()
+        if exit_code != 0 or not _is_valid_cwd(cwd):
+            raise RuntimeError(cwd or f"pwd exited with code {exit_code}")
+        _cwd_cache = cwd
+    return _cwd_cache
+
 
 def _get_shell_backend() -> ShellBackendProtocol:
     """Get the appropriate shell backend based on configuration."""
-    global _current_backend
+    global _current_backend, _cwd_cache
     
     config = get_config()
     
     if _current_backend is not None:
         return _current_backend
     
+    _cwd_cache = None
+    
     if config.shell_backend == ShellBackend.DOCKER:
+        # The Docker backend pulls in SWE-ReX's remote runtime; load it on demand
+        from ..backends.shell_docker import get_docker_shell
+        
         _current_backend = get_docker_shell(
             project_root=str(config.project_root),
             image=config.docker_image
@@ -52,6 +95,13 @@ def _get_shell_backend() -> ShellBackendProtocol:
     return _current_backend
 
 
+def _format_command_result(output: str, exit_code: int) -> str:
+    """Format command output, appending the exit code on failure."""
+    if exit_code == 0:
+        return output
+    return f"{output}\n[Exit code: {exit_code}]" if output else f"[Exit code: {exit_code}]"
+
+
 def execute_bash(command: str, timeout: int = 30) -> str:
     """Execute a bash command in a persistent shell session.
     
@@ -79,16 +129,12 @@ def execute_bash(command: str, timeout: int = 30) -> str:
         >>> execute_bash("echo $MY_VAR")
         'test'
     """
-    config = get_config()
     backend = _get_shell_backend()
+    _invalidate_cwd_if_changed(command)
     
     try:
         output, exit_code = backend.run(command, timeout=timeout)
-        
-        if exit_code == 0:
-            return output
-        else:
-            return f"{output}\n[Exit code: {exit_code}]" if output else f"[Exit code: {exit_code}]"
+        return _format_command_result(output, exit_code)
             
     except TimeoutError as e:
         return f"Command timed out after {timeout} seconds: {str(e)}"
@@ -110,6 +156,7 @@ def execute_bash_with_status(command: str, timeout: int = 30) -> dict:
         Dictionary with 'output', 'exit_code', and 'success' fields.
     """
     backend = _get_shell_backend()
+    _invalidate_cwd_if_changed(command)
     
     try:
         output, exit_code = backend.run(command, timeout=timeout)
@@ -141,7 +188,7 @@ def get_working_directory() -> str:
     backend = _get_shell_backend()
     
     try:
-        return backend.get_working_directory()
+        return _current_working_directory(backend)
     except Exception as e:
         return f"Error getting working directory: {str(e)}"
 
@@ -155,13 +202,20 @@ def change_directory(path: str) -> str:
     Returns:
         The new working directory path, or an error message.
     """
+    global _cwd_cache
+    
     backend = _get_shell_backend()
+    _cwd_cache = None
     
     try:
         output, exit_code = backend.run(f'cd "{path}" && pwd')
         
         if exit_code == 0:
-            return f"Changed directory to: {output.strip()}"
+            # The trailing pwd already reports the new directory
+            cwd = output.strip()
+            if _is_valid_cwd(cwd):
+                _cwd_cache = cwd
+            return f"Changed directory to: {cwd}"
         else:
             return f"Failed to change directory: {output}"
             
@@ -178,7 +232,10 @@ def reset_shell_session() -> str:
     Returns:
         A confirmation message.
     """
+    global _cwd_cache
+    
     backend = _get_shell_backend()
+    _cwd_cache = None
     
     try:
         backend.reset()
@@ -203,7 +260,7 @@ def get_shell_info() -> str:
     
     if backend.is_running():
         try:
-            cwd = backend.get_working_directory()
+            cwd = _current_working_directory(backend)
             info_lines.append(f"Working Directory: {cwd}")
         except Exception:
             info_lines.append("Working Directory: (unable to determine)")
@@ -218,7 +275,9 @@ def run_python(code: str, timeout: int = 60) -> str:
     """Execute Python code in the shell session.
     
     This is a convenience wrapper that runs Python code using
-    the python3 interpreter in the shell.
+    the python3 interpreter in the shell. When persistent_python is
+    enabled and the backend supports it, the code runs in a long-lived
+    interpreter instead, skipping interpreter startup.
     
     Args:
         code: Python code to execute.
@@ -227,9 +286,30 @@ def run_python(code: str, timeout: int = 60) -> str:
     Returns:
         The output from running the Python code.
     """
-    # Escape quotes and format for shell
-    escaped_code = code.replace("'", "'\"'\"'")
-    command = f"python3 -c '{escaped_code}'"
+    config = get_config()
+    backend = _get_shell_backend()
+    
+    if config.persistent_python and hasattr(backend, "run_python"):
+        cwd = None
+        if backend.is_running():
+            try:
+                cwd = _current_working_directory(backend)
+            except Exception:
+                pass
+        try:
+            output, exit_code = backend.run_python(code, cwd=cwd, timeout=timeout)
+            return _format_command_result(output, exit_code)
+        except TimeoutError as e:
+            return f"Command timed out after {timeout} seconds: {str(e)}"
+        except Exception as e:
+            return f"Error executing command: {str(e)}"
+    
+    # Base64 keeps the payload free of shell metacharacters
+    payload = base64.b64encode(code.encode("utf-8")).decode("ascii")
+    command = (
+        f"python3 -c \"import base64; "
+        f"exec(base64.b64decode('{payload}').decode('utf-8'))\""
+    )
     
     return execute_bash(command, timeout=timeout)
 
@@ -276,14 +356,17 @@ def close_shell() -> None:
     This should be called when done using shell tools to clean up
     resources (especially for Docker backend).
     """
-    global _current_backend
+    global _current_backend, _cwd_cache
     
     config = get_config()
     
     if config.shell_backend == ShellBackend.DOCKER:
+        from ..backends.shell_docker import close_docker_shell
+        
         close_docker_shell()
     else:
         close_local_shell()
     
     _current_backend = None
+    _cwd_cache = None
 
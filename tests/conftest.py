@@ -0,0 +1,12 @@
+import pytest
+
+from otter_code.config import ToolConfig, get_config, set_config
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Point the global tool configuration at a fresh project directory."""
+    saved = get_config()
+    set_config(ToolConfig(project_root=tmp_path))
+    yield tmp_path
+    set_config(saved)
@@ -0,0 +1,286 @@
+import os
+import random
+import stat
+
+import pytest
+
+from otter_code.tools import code_editing
+from otter_code.tools.code_editing import (
+    FuzzyMatcher,
+    Hunk,
+    _atomic_write,
+    _find_ignoring_whitespace,
+    _parse_unified_diff,
+    apply_diff,
+    search_replace,
+    search_replace_all,
+)
+
+
+def test_search_replace_all_replaces_every_occurrence(project):
+    target = project / "a.py"
+    target.write_text("x = 1\nx = 2\ny = x\n")
+    
+    assert "3 occurrence(s)" in search_replace_all("a.py", "x", "z")
+    assert target.read_text() == "z = 1\nz = 2\ny = z\n"
+
+
+def test_search_replace_all_not_found(project):
+    (project / "a.py").write_text("x = 1\n")
+    
+    with pytest.raises(ValueError):
+        search_replace_all("a.py", "missing", "z")
+    with pytest.raises(ValueError):
+        search_replace_all("a.py", "", "z")
+
+
+def test_search_replace_all_matches_multiline_search_in_crlf_file(project):
+    target = project / "crlf.txt"
+    target.write_bytes(b"a\r\nb\r\nc\r\n")
+    
+    assert "1 occurrence(s)" in search_replace_all("crlf.txt", "a\nb", "X")
+    assert target.read_text() == "X\nc\n"
+
+
+def test_search_replace_and_search_replace_all_agree_on_crlf(project):
+    (project / "one.txt").write_bytes(b"a\r\nb\r\n")
+    (project / "all.txt").write_bytes(b"a\r\nb\r\n")
+    
+    search_replace("one.txt", "a\nb", "X")
+    search_replace_all("all.txt", "a\nb", "X")
+    assert (project / "one.txt").read_bytes() == (project / "all.txt").read_bytes()
+
+
+def test_find_ignoring_whitespace_collapses_runs():
+    text = "def f():\n    return  1\n"
+    start, end = _find_ignoring_whitespace(text, "return 1")
+    assert text[start:end] == "return  1"
+    
+    text = "call(a,\n     b)\n"
+    start, end = _find_ignoring_whitespace(text, "call(a, b)")
+    assert text[start:end] == "call(a,\n     b)"
+
+
+def test_find_ignoring_whitespace_covers_indentation_and_newline_of_pattern():
+    text = "if x:\n        y  =  1\nz = 2\n"
+    start, end = _find_ignoring_whitespace(text, "    y = 1\n")
+    assert text[start:end] == "        y  =  1\n"
+    assert text[:start] + text[end:] == "if x:\nz = 2\n"
+
+
+def test_find_ignoring_whitespace_covers_leading_newline_of_pattern():
+    text = "a\n    foo\nb\n"
+    start, end = _find_ignoring_whitespace(text, "\nfoo")
+    assert text[start:end] == "\n    foo"
+    assert FuzzyMatcher().apply_replacement(text, "\nfoo", "\nbar") == ("a\nbar\nb\n", True)
+
+
+def test_find_ignoring_whitespace_prefers_match_nearest_expected_location():
+    text = "x  = 1\n" * 3 + "y\n"
+    
+    assert _find_ignoring_whitespace(text, "x = 1") == (0, 6)
+    assert _find_ignoring_whitespace(text, "x = 1", 14) == (14, 20)
+    assert _find_ignoring_whitespace(text, "x = 1", 10) == (7, 13)
+    assert _find_ignoring_whitespace(text, "x = 1", 100) == (14, 20)
+    assert FuzzyMatcher().find_match(text, "x = 1", 14) == (14, 20)
+
+
+def test_find_ignoring_whitespace_misses():
+    assert _find_ignoring_whitespace("a b c", "") is None
+    assert _find_ignoring_whitespace("a b c", " \n\t") is None
+    assert _find_ignoring_whitespace("a b c", "a c") is None
+
+
+def test_find_ignoring_whitespace_matches_collapsed_search():
+    rng = random.Random(0)
+    alphabet = "ab \n\t"
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+        pattern = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+        collapsed_pattern = " ".join(pattern.split())
+        result = _find_ignoring_whitespace(text, pattern)
+        if result is None:
+            assert not collapsed_pattern or collapsed_pattern not in " ".join(text.split())
+        else:
+            start, end = result
+            assert " ".join(text[start:end].split()) == collapsed_pattern
+
+
+def test_fuzzy_matcher_prefers_exact_then_whitespace_match():
+    matcher = FuzzyMatcher()
+    text = "x = 1\nif x:\n    y  =  2\n"
+    
+    assert matcher.find_match(text, "x = 1") == (0, 5)
+    new_text, found = matcher.apply_replacement(text, "y = 2", "y = 3")
+    assert found
+    assert new_text == "x = 1\nif x:\n    y = 3\n"
+
+
+def test_search_replace_tolerates_reindented_search(project):
+    target = project / "a.py"
+    target.write_text("class A:\n    def f(self):\n        return 1\n")
+    
+    search_replace("a.py", "def f(self):\n    return 1", "def f(self):\n        return 2")
+    assert target.read_text() == "class A:\n    def f(self):\n        return 2\n"
+
+
+def test_atomic_write_replaces_content_and_keeps_mode(tmp_path):
+    target = tmp_path / "run.sh"
+    target.write_text("old\n")
+    target.chmod(0o750)
+    
+    _atomic_write(str(target), "new\n")
+    assert target.read_text() == "new\n"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o750
+    
+    _atomic_write(str(target), b"\xff\x00")
+    assert target.read_bytes() == b"\xff\x00"
+    assert os.listdir(tmp_path) == ["run.sh"]
+
+
+@pytest.mark.parametrize("umask", [0o022, 0o077])
+def test_atomic_write_creates_missing_file_with_umask_mode(tmp_path, umask):
+    saved = os.umask(umask)
+    try:
+        _atomic_write(str(tmp_path / "new.txt"), "héllo")
+    finally:
+        os.umask(saved)
+    assert (tmp_path / "new.txt").read_bytes() == "héllo".encode()
+    assert stat.S_IMODE((tmp_path / "new.txt").stat().st_mode) == 0o666 & ~umask
+
+
+def test_atomic_write_falls_back_to_in_place_write(tmp_path, monkeypatch):
+    # Stands in for a read-only directory, which root would ignore
+    def no_temp_file(path):
+        raise PermissionError(13, "Permission denied", path)
+    
+    monkeypatch.setattr(code_editing, "_create_temp_file", no_temp_file)
+    target = tmp_path / "a.txt"
+    target.write_text("old")
+    target.chmod(0o640)
+    
+    _atomic_write(str(target), "new")
+    assert target.read_text() == "new"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+def test_atomic_write_failure_keeps_original_and_removes_temp_file(tmp_path, monkeypatch):
+    target = tmp_path / "a.txt"
+    target.write_text("keep")
+    
+    def fail(src, dst):
+        raise OSError("replace failed")
+    
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError, match="replace failed"):
+        _atomic_write(str(target), "lost")
+    assert target.read_text() == "keep"
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+
+NUMBERED = "".join(f"line{i}\n" for i in range(1, 11))
+
+
+def test_apply_diff_multiple_hunks(project):
+    target = project / "a.txt"
+    target.write_text(NUMBERED)
+    # Line numbers refer to the original file, although the first hunk
+    # shifts everything below it
+    diff = (
+        "@@ -2,3 +2,4 @@\n"
+        " line2\n"
+        "-line3\n"
+        "+three\n"
+        "+and a half\n"
+        " line4\n"
+        "@@ -8,2 +9,4 @@\n"
+        " line8\n"
+        "+extra1\n"
+        "+extra2\n"
+        "-line9\n"
+        "+nine\n"
+    )
+    
+    assert apply_diff("a.txt", diff) == "Applied 2 hunk(s) to a.txt"
+    assert target.read_text() == NUMBERED.replace("line3\n", "three\nand a half\n").replace(
+        "line9\n", "extra1\nextra2\nnine\n"
+    )
+
+
+def test_apply_diff_out_of_order_hunks(project):
+    target = project / "a.txt"
+    target.write_text(NUMBERED)
+    diff = (
+        "@@ -5,1 +4,1 @@\n"
+        "-line5\n"
+        "+five\n"
+        "@@ -1,2 +1,1 @@\n"
+        "-line1\n"
+        " line2\n"
+        "@@ -9,1 +8,3 @@\n"
+        "-line9\n"
+        "+a\n"
+        "+b\n"
+        "+c\n"
+    )
+    
+    apply_diff("a.txt", diff)
+    assert target.read_text() == (
+        NUMBERED.replace("line1\n", "").replace("line5\n", "five\n").replace("line9\n", "a\nb\nc\n")
+    )
+
+
+def test_apply_diff_at_old_start_zero(project):
+    target = project / "new.txt"
+    target.write_text("")
+    
+    apply_diff("new.txt", "--- /dev/null\n+++ b/new.txt\n@@ -0,0 +1,2 @@\n+first\n+second\n")
+    assert target.read_text() == "first\nsecond\n"
+    
+    # old_start 0 means "before line 1", not the end of the file
+    apply_diff("new.txt", "@@ -0,0 +1 @@\n+zeroth\n")
+    assert target.read_text() == "zeroth\nfirst\nsecond\n"
+
+
+def test_apply_diff_skips_git_headers(project):
+    target = project / "a.txt"
+    target.write_text(NUMBERED)
+    diff = (
+        "diff --git a/a.txt b/a.txt\n"
+        "index 1234567..89abcde 100644\n"
+        "--- a/a.txt\n"
+        "+++ b/a.txt\n"
+        "@@ -5 +5 @@\n"
+        "-line5\n"
+        "+five\n"
+    )
+    
+    apply_diff("a.txt", diff)
+    assert target.read_text() == NUMBERED.replace("line5\n", "five\n")
+
+
+def test_parse_unified_diff_headers_and_default_counts():
+    diff = (
+        "diff --git a/a.txt b/a.txt\n"
+        "index 1234567..89abcde 100644\n"
+        "--- a/a.txt\n"
+        "+++ b/a.txt\n"
+        "@@ -3 +3,2 @@ def f():\n"
+        "-old\n"
+        "+new\n"
+        "+more\n"
+        "diff --git a/b.txt b/b.txt\n"
+        "index 7654321..edcba98 100644\n"
+        "--- a/b.txt\n"
+        "+++ b/b.txt\n"
+        "@@ -1,2 +1 @@\n"
+        " keep\n"
+        "\n"
+        "-gone\n"
+    )
+    
+    assert _parse_unified_diff(diff) == [
+        Hunk(3, 1, 3, 2, [("delete", "old\n"), ("add", "new\n"), ("add", "more\n")]),
+        Hunk(1, 2, 1, 1, [("context", "keep\n"), ("context", "\n"), ("delete", "gone\n")]),
+    ]
+    assert _parse_unified_diff("--- a/a.txt\n+++ b/a.txt\nno hunks\n") == []
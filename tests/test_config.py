@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from otter_code.config import ToolConfig
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "proj"
+    (root / "a").mkdir(parents=True)
+    (root / "b").mkdir()
+    (root / "a" / "f").write_text("a")
+    (root / "b" / "f").write_text("b")
+    return root
+
+
+def test_resolve_path_relative_and_absolute(project):
+    config = ToolConfig(project_root=project)
+    
+    assert config.resolve_path("a/f") == project / "a" / "f"
+    assert config.resolve_path(str(project / "b" / "f")) == project / "b" / "f"
+    assert config.resolve_path("a/../b/f") == project / "b" / "f"
+
+
+def test_resolve_path_rejects_outside_paths(project):
+    config = ToolConfig(project_root=project)
+    
+    with pytest.raises(ValueError):
+        config.resolve_path("../outside")
+    with pytest.raises(ValueError):
+        config.resolve_path("/etc/passwd")
+
+
+def test_resolve_path_follows_retargeted_symlink(project):
+    config = ToolConfig(project_root=project)
+    link = project / "l2"
+    
+    link.symlink_to(project / "a")
+    assert config.resolve_path("l2/f") == project / "a" / "f"
+    
+    link.unlink()
+    link.symlink_to(project / "b")
+    assert config.resolve_path("l2/f") == project / "b" / "f"
+
+
+def test_resolve_path_notices_component_replaced_by_symlink(project, tmp_path):
+    config = ToolConfig(project_root=project)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "f").write_text("secret")
+    
+    assert config.resolve_path("a/f") == project / "a" / "f"
+    
+    (project / "a" / "f").unlink()
+    (project / "a").rmdir()
+    (project / "a").symlink_to(outside)
+    with pytest.raises(ValueError):
+        config.resolve_path("a/f")
+
+
+def test_relative_project_root_uses_current_directory(tmp_path, monkeypatch):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    
+    monkeypatch.chdir(first)
+    assert ToolConfig(project_root=".").project_root == first
+    
+    monkeypatch.chdir(second)
+    assert ToolConfig(project_root=".").project_root == second
+
+
+def test_is_path_allowed_is_lexical(project):
+    config = ToolConfig(project_root=project)
+    
+    assert config.is_path_allowed(project)
+    assert config.is_path_allowed(project / "a" / "f")
+    assert not config.is_path_allowed(str(project) + "-other")
+    assert not config.is_path_allowed(os.path.dirname(project))
+
+
+def test_reassigning_paths_updates_boundaries(project):
+    config = ToolConfig(project_root=project / "a")
+    assert config.resolve_path("f") == project / "a" / "f"
+    
+    config.project_root = project / "b"
+    assert config.resolve_path("f") == project / "b" / "f"
+    with pytest.raises(ValueError):
+        config.resolve_path(str(project / "a" / "f"))
+    
+    config.allowed_paths = [str(project / "a"), project / "b"]
+    assert config.allowed_paths == (project / "a", project / "b")
+    assert config.resolve_path(str(project / "a" / "f")) == project / "a" / "f"
+    
+    with pytest.raises(AttributeError):
+        config.allowed_paths.append(project)
@@ -0,0 +1,170 @@
+import os
+
+import pytest
+
+from otter_code.tools.filesystem import (
+    _format_size,
+    find_in_files,
+    list_directory,
+    read_file,
+    search_files,
+    write_file,
+    write_file_bytes,
+)
+
+
+def test_find_in_files_regex_reports_only_matching_lines(project):
+    (project / "a.py").write_text("import os\n\n    def foo():\n        pass\n")
+    
+    result = find_in_files(r"^\s*def", regex=True)
+    assert "3: def foo():" in result
+    assert "2:" not in result
+    
+    result = find_in_files(r"\s+pass", regex=True)
+    assert "4: pass" in result
+    assert "3:" not in result
+
+
+def test_find_in_files_literal_does_not_span_lines(project):
+    (project / "b.txt").write_text("a\nb\n")
+    
+    assert find_in_files("a\nb").startswith("No matches")
+    assert "2: b" in find_in_files("b")
+
+
+def test_find_in_files_lists_each_match_on_its_own_line(project):
+    (project / "c.py").write_text("x = 1\ny = 2\nx = 3\n")
+    
+    assert find_in_files("x =").splitlines() == [
+        "Found matches in 1 files:",
+        "",
+        "c.py:",
+        "  1: x = 1",
+        "  3: x = 3",
+    ]
+
+
+def test_file_used_as_directory_is_not_found(project):
+    (project / "main.py").write_text("")
+    
+    with pytest.raises(FileNotFoundError, match="File not found: main.py/x"):
+        read_file("main.py/x")
+    with pytest.raises(FileNotFoundError, match="Directory not found: main.py/x"):
+        list_directory("main.py/x")
+
+
+def test_write_file_rejects_non_str_without_truncating(project):
+    target = project / "a.txt"
+    target.write_text("keep")
+    
+    with pytest.raises(TypeError):
+        write_file("a.txt", None)
+    with pytest.raises(TypeError):
+        write_file("a.txt", b"bytes")
+    assert target.read_text() == "keep"
+
+
+def test_write_file_creates_parent_directories(project):
+    assert "5 characters" in write_file("x/y/z.txt", "héllo")
+    assert (project / "x" / "y" / "z.txt").read_bytes() == "héllo".encode()
+
+
+def test_write_file_bytes(project):
+    data = bytes(range(256)) * 5000
+    
+    assert f"{len(data)} bytes" in write_file_bytes("bin/data.bin", data)
+    assert (project / "bin" / "data.bin").read_bytes() == data
+    
+    write_file_bytes("bin/data.bin", memoryview(b"abcdef")[2:])
+    assert (project / "bin" / "data.bin").read_bytes() == b"cdef"
+    
+    with pytest.raises(TypeError):
+        write_file_bytes("bin/data.bin", "text")
+    assert (project / "bin" / "data.bin").read_bytes() == b"cdef"
+
+
+def test_search_files_ignores_dot_and_empty_segments(project):
+    (project / "main.py").write_text("hello\n")
+    (project / "src").mkdir()
+    (project / "src" / "app.py").write_text("hello\n")
+    
+    assert search_files("./*.py") == "main.py"
+    assert search_files("src//*.py") == "src/app.py"
+    assert search_files("./src/./*.py") == "src/app.py"
+    assert search_files("./**/*.py").splitlines() == ["main.py", "src/app.py"]
+    assert search_files("*.py/").startswith("No files")
+    assert "main.py:" in find_in_files("hello", file_pattern="./*.py")
+
+
+
+@pytest.fixture
+def listing_tree(project):
+    (project / "pkg" / "sub").mkdir(parents=True)
+    (project / "pkg" / "mod.py").write_text("x" * 2048)
+    (project / "pkg" / "sub" / "deep.py").write_text("")
+    (project / "node_modules" / "dep").mkdir(parents=True)
+    (project / "node_modules" / "dep" / "index.js").write_text("")
+    (project / ".git").mkdir()
+    (project / ".env").write_text("")
+    (project / "README").write_text("hi")
+    (project / "link").symlink_to(project / "pkg", target_is_directory=True)
+    return project
+
+
+def test_list_directory(listing_tree):
+    assert list_directory().splitlines() == [
+        "[FILE] README (2B)",
+        "[DIR]  link/",
+        "[DIR]  node_modules/",
+        "[DIR]  pkg/",
+    ]
+    assert list_directory("pkg").splitlines() == [
+        "[FILE] mod.py (2.0KB)",
+        "[DIR]  sub/",
+    ]
+
+
+def test_list_directory_recursive(listing_tree):
+    # Ignored and symlinked directories are listed but not descended into
+    assert list_directory(recursive=True).splitlines() == [
+        "[DIR]  link/",
+        "[DIR]  node_modules/",
+        "[DIR]  pkg/",
+        "[FILE] README (2B)",
+        f"[DIR]  pkg{os.sep}sub/",
+        f"[FILE] pkg{os.sep}mod.py (2.0KB)",
+        f"[FILE] pkg{os.sep}sub{os.sep}deep.py (0B)",
+    ]
+
+
+def test_list_directory_errors(project):
+    (project / "empty").mkdir()
+    (project / "f.txt").write_text("")
+    
+    assert list_directory("empty") == "Directory 'empty' is empty"
+    with pytest.raises(ValueError, match="not a directory"):
+        list_directory("f.txt")
+    with pytest.raises(FileNotFoundError, match="Directory not found"):
+        list_directory("missing")
+
+
+def _format_size_by_division(size):
+    # The loop _format_size replaced
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f}{unit}" if unit != 'B' else f"{size}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+def test_format_size():
+    assert _format_size(0) == "0B"
+    assert _format_size(1023) == "1023B"
+    assert _format_size(1024) == "1.0KB"
+    assert _format_size(1536) == "1.5KB"
+    assert _format_size(5 * 1024 ** 3) == "5.0GB"
+    assert _format_size(3 * 1024 ** 5) == "3072.0TB"
+    
+    for exponent in range(1, 6):
+        for size in (1024 ** exponent - 1, 1024 ** exponent, 1024 ** exponent + 1):
+            assert _format_size(size) == _format_size_by_division(size)
@@ -0,0 +1,163 @@
+import os
+
+import pytest
+
+from otter_code.tools import _index
+from otter_code.tools._index import FileIndex, clear_file_indexes, get_file_index
+
+
+# A directory mtime far enough in the past to be outside the racy window
+OLD_MTIME_NS = 1_000_000_000_000_000_000
+
+
+def snapshot(index, max_depth=None):
+    return {rel_dir: sorted(files) for rel_dir, files in index.walk(max_depth)}
+
+
+def age(path, mtime_ns=OLD_MTIME_NS):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "top.py").write_text("")
+    (tmp_path / "a" / "mid.py").write_text("")
+    (tmp_path / "a" / "b" / "deep.py").write_text("")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "h.py").write_text("")
+    (tmp_path / ".dot.py").write_text("")
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    clear_file_indexes()
+    yield
+    clear_file_indexes()
+
+
+def test_walk_skips_hidden_entries_and_visits_in_order(tree):
+    index = FileIndex(str(tree))
+    
+    assert list(snapshot(index)) == ["", "a", os.path.join("a", "b")]
+    assert snapshot(index) == {
+        "": ["top.py"],
+        "a": ["mid.py"],
+        os.path.join("a", "b"): ["deep.py"],
+    }
+
+
+def test_walk_respects_max_depth(tree):
+    index = FileIndex(str(tree))
+    
+    assert snapshot(index, max_depth=0) == {"": ["top.py"]}
+    assert list(snapshot(index, max_depth=1)) == ["", "a"]
+
+
+def test_nested_add_remove_and_rename_are_seen(tree):
+    # Old, distinct mtimes after every change: each rescan below is caused
+    # by the mtime comparison, not by the racy-window rule
+    index = FileIndex(str(tree))
+    deep = os.path.join("a", "b")
+    for path in (tree, tree / "a", tree / "a" / "b"):
+        age(path)
+    snapshot(index)
+    
+    (tree / "a" / "b" / "new.py").write_text("")
+    age(tree / "a" / "b", OLD_MTIME_NS + 1)
+    assert snapshot(index)[deep] == ["deep.py", "new.py"]
+    
+    (tree / "a" / "b" / "deep.py").unlink()
+    age(tree / "a" / "b", OLD_MTIME_NS + 2)
+    assert snapshot(index)[deep] == ["new.py"]
+    
+    (tree / "a" / "b" / "new.py").rename(tree / "a" / "b" / "renamed.py")
+    age(tree / "a" / "b", OLD_MTIME_NS + 3)
+    assert snapshot(index)[deep] == ["renamed.py"]
+    
+    (tree / "a" / "b").rename(tree / "a" / "c")
+    age(tree / "a", OLD_MTIME_NS + 4)
+    result = snapshot(index)
+    assert deep not in result
+    assert result[os.path.join("a", "c")] == ["renamed.py"]
+
+
+def test_removed_subtree_is_forgotten(tree):
+    index = FileIndex(str(tree))
+    snapshot(index)
+    
+    (tree / "a" / "b" / "deep.py").unlink()
+    (tree / "a" / "b").rmdir()
+    
+    assert snapshot(index) == {"": ["top.py"], "a": ["mid.py"]}
+    assert os.path.join("a", "b") not in index._listings
+
+
+def test_unchanged_old_directory_is_served_from_cache(tree):
+    index = FileIndex(str(tree))
+    age(tree / "a")
+    snapshot(index)
+    
+    # A change that leaves the (old) mtime untouched is not noticed: the
+    # listing is trusted because its mtime is outside the racy window
+    (tree / "a" / "sneaky.py").write_text("")
+    age(tree / "a")
+    assert snapshot(index)["a"] == ["mid.py"]
+
+
+def test_recently_modified_directory_is_rescanned(tree, monkeypatch):
+    index = FileIndex(str(tree))
+    now = 2_000_000_000_000_000_000
+    monkeypatch.setattr(_index.time, "time_ns", lambda: now)
+    age(tree / "a", now - 1)
+    snapshot(index)
+    
+    # Same mtime as when listed, but within the racy window of the scan,
+    # so the listing is not trusted and the new file is found
+    (tree / "a" / "racy.py").write_text("")
+    age(tree / "a", now - 1)
+    assert snapshot(index)["a"] == ["mid.py", "racy.py"]
+
+
+def test_ignored_dirs_are_pruned_but_same_named_files_are_kept(tree):
+    (tree / "node_modules" / "pkg").mkdir(parents=True)
+    (tree / "node_modules" / "pkg" / "index.js").write_text("")
+    (tree / "a" / "build").mkdir()
+    (tree / "a" / "build" / "out.py").write_text("")
+    (tree / "build").write_text("")
+    
+    result = snapshot(FileIndex(str(tree), frozenset({"node_modules", "build"})))
+    assert list(result) == ["", "a", os.path.join("a", "b")]
+    assert "build" in result[""]
+
+
+def test_symlinked_directories_are_not_descended(tree):
+    (tree / "link").symlink_to(tree / "a", target_is_directory=True)
+    
+    result = snapshot(FileIndex(str(tree)))
+    assert "link" not in result
+    assert "link" not in result[""]
+
+
+def test_get_file_index_keys_on_root_and_ignored_dirs(tree):
+    root = str(tree)
+    
+    assert get_file_index(root) is get_file_index(root)
+    assert get_file_index(root, {"a"}) is get_file_index(root, frozenset({"a"}))
+    assert get_file_index(root, {"a"}) is not get_file_index(root)
+
+
+def test_get_file_index_evicts_oldest_root(tmp_path):
+    roots = []
+    for i in range(_index._MAX_INDEXES + 1):
+        root = tmp_path / f"r{i}"
+        root.mkdir()
+        roots.append(str(root))
+    
+    first = get_file_index(roots[0])
+    for root in roots[1:]:
+        get_file_index(root)
+    
+    assert len(_index._indexes) == _index._MAX_INDEXES
+    assert get_file_index(roots[0]) is not first
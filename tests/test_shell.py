@@ -0,0 +1,147 @@
+import pytest
+
+from otter_code.config import ToolConfig
+from otter_code.tools import shell
+
+
+class FakeBackend:
+    """Shell backend that understands just enough cd/pushd/popd to track a cwd."""
+    
+    def __init__(self, cwd="/work"):
+        self.cwd = cwd
+        self.stack = []
+        self.commands = []
+        self.pwd_reply = None
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        pass
+    
+    def is_running(self):
+        return True
+    
+    def reset(self):
+        self.cwd = "/work"
+    
+    def get_working_directory(self):
+        return self.cwd
+    
+    def run(self, command, timeout=30):
+        self.commands.append(command)
+        for part in command.split(" && "):
+            if part.startswith("cd "):
+                self.cwd = part[3:].strip('"')
+            elif part.startswith("pushd "):
+                self.stack.append(self.cwd)
+                self.cwd = part[6:]
+            elif part == "popd":
+                self.cwd = self.stack.pop()
+        if command.endswith("pwd"):
+            return self.pwd_reply or (self.cwd, 0)
+        return ("", 0)
+    
+    def pwd_calls(self):
+        return self.commands.count("pwd")
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    created = []
+    
+    def get_local_shell(working_directory=None):
+        created.append(FakeBackend())
+        return created[-1]
+    
+    monkeypatch.setattr(shell, "get_local_shell", get_local_shell)
+    monkeypatch.setattr(shell, "close_local_shell", lambda: None)
+    monkeypatch.setattr(shell, "_current_backend", None)
+    monkeypatch.setattr(shell, "_cwd_cache", None)
+    return created
+
+
+def test_working_directory_is_cached_until_it_may_change(backends):
+    assert shell.get_working_directory() == "/work"
+    assert shell.get_working_directory() == "/work"
+    backend = backends[0]
+    assert backend.pwd_calls() == 1
+    
+    shell.execute_bash("echo hi")
+    assert shell.get_working_directory() == "/work"
+    assert backend.pwd_calls() == 1
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("cd /src", "/src"),
+    ("pushd /src", "/src"),
+    ("pushd /src && popd", "/work"),
+])
+def test_cd_pushd_popd_invalidate_cached_directory(backends, command, expected):
+    shell.get_working_directory()
+    
+    shell.execute_bash(command)
+    assert shell.get_working_directory() == expected
+    assert backends[0].pwd_calls() == 2
+    
+    shell.execute_bash_with_status("cd /other")
+    assert shell.get_working_directory() == "/other"
+
+
+def test_change_directory_caches_reported_directory(backends):
+    shell.get_working_directory()
+    
+    assert shell.change_directory("/src") == "Changed directory to: /src"
+    assert shell.get_working_directory() == "/src"
+    assert backends[0].pwd_calls() == 1
+
+
+def test_reset_shell_session_invalidates_cached_directory(backends):
+    shell.change_directory("/src")
+    
+    shell.reset_shell_session()
+    assert shell.get_working_directory() == "/work"
+
+
+@pytest.mark.parametrize("reset", [shell.close_shell, lambda: setattr(shell, "_current_backend", None)])
+def test_new_backend_invalidates_cached_directory(backends, reset):
+    shell.change_directory("/src")
+    
+    reset()
+    assert shell.get_working_directory() == "/work"
+    assert len(backends) == 2
+
+
+@pytest.mark.parametrize("reply", [("bash: pwd: error", 1), ("", 0), ("relative", 0), ("boom", -1)])
+def test_failed_pwd_is_not_cached(backends, reply):
+    shell.get_shell_info()
+    backend = backends[0]
+    backend.pwd_reply = reply
+    shell.change_directory("/src")
+    shell.execute_bash("cd /src")
+    
+    assert shell.get_working_directory().startswith("Error getting working directory")
+    assert "unable to determine" in shell.get_shell_info()
+    
+    backend.pwd_reply = None
+    assert shell.get_working_directory() == "/src"
+
+
+def test_persistent_run_python_gets_cwd_from_backend(backends, monkeypatch):
+    monkeypatch.setattr(shell, "get_config", lambda: ToolConfig(persistent_python=True))
+    calls = []
+    
+    def run_python(code, cwd=None, timeout=60):
+        calls.append(cwd)
+        return ("ok", 0)
+    
+    shell.get_working_directory()
+    backend = backends[0]
+    backend.run_python = run_python
+    shell.execute_bash("cd /src")
+    assert shell.run_python("pass") == "ok"
+    
+    backend.pwd_reply = ("bash: pwd: error", 1)
+    shell.execute_bash("cd /other")
+    assert shell.run_python("pass") == "ok"
+    assert calls == ["/src", None]
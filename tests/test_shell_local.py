@@ -0,0 +1,73 @@
+import pytest
+
+from otter_code.backends.shell_local import LocalShellBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    # run_python uses its own worker process, so the bash session is not started
+    backend = LocalShellBackend(working_directory=str(tmp_path))
+    yield backend
+    backend._stop_python_worker()
+
+
+def test_run_python_captures_output_and_exit_code(backend):
+    assert backend.run_python("print('hi')") == ("hi", 0)
+    assert backend.run_python("import sys; print('err', file=sys.stderr)") == ("err", 0)
+    assert backend.run_python("import os; os.system('echo from-child')") == ("from-child", 0)
+    assert backend.run_python("raise SystemExit(3)") == ("", 3)
+    assert backend.run_python("raise SystemExit('bye')") == ("bye", 1)
+    
+    output, exit_code = backend.run_python("1 / 0")
+    assert exit_code == 1
+    assert "ZeroDivisionError" in output
+
+
+def test_run_python_reuses_worker_with_fresh_namespace(backend):
+    backend.run_python("x = 1")
+    worker = backend._python_worker
+    
+    output, exit_code = backend.run_python("print(x)")
+    assert exit_code == 1
+    assert "NameError" in output
+    assert backend._python_worker is worker
+    assert backend.run_python("print(__name__)") == ("__main__", 0)
+
+
+def test_run_python_runs_in_cwd_and_reloads_project_modules(backend, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "mod.py").write_text("VALUE = 1\n")
+    
+    code = "import mod; print(mod.VALUE)"
+    assert backend.run_python(code, cwd=str(tmp_path / "sub")) == ("1", 0)
+    (tmp_path / "sub" / "mod.py").write_text("VALUE = 2\n")
+    assert backend.run_python(code, cwd=str(tmp_path / "sub")) == ("2", 0)
+    assert backend.run_python("import os; print(os.getcwd())") == (str(tmp_path / "sub"), 0)
+
+
+def test_run_python_timeout_restarts_worker(backend):
+    with pytest.raises(TimeoutError):
+        backend.run_python("import time; time.sleep(10)", timeout=1)
+    assert backend._python_worker is None
+    
+    assert backend.run_python("print('back')") == ("back", 0)
+
+
+def test_run_python_recovers_from_worker_exit(backend):
+    output, exit_code = backend.run_python("import os; os._exit(0)")
+    assert exit_code == -1
+    assert "exited unexpectedly" in output
+    
+    assert backend.run_python("print('back')") == ("back", 0)
+
+
+def test_run_python_keeps_only_library_modules_warm(backend):
+    # The worker's own globals live in the real __main__ module
+    code = (
+        "import os, sys\n"
+        "prefixes = sys.modules['__main__'].stable_prefixes\n"
+        "print(os.__file__.startswith(prefixes))\n"
+        "print(os.path.join(sys.prefix, 'src', 'mod.py').startswith(prefixes))\n"
+        "print(all(p.endswith(os.sep) for p in prefixes))\n"
+    )
+    assert backend.run_python(code) == ("True\nFalse\nTrue", 0)